@@ -0,0 +1,283 @@
+"""
+Lockstep simulation of many games of minesweeper with the same dimensions,
+for measuring the win rate of the solvers over a large number of boards.
+The games are held as stacked NumPy arrays, with a leading axis over the
+games: where the mines are, the number shown by each square, and which
+squares are revealed and flagged. Reveals, including the automatic reveal
+around squares with no surrounding mines, and the deductions that follow
+from a single number (all of its blank neighbors are free, or all of them
+are mines) are applied to every game at once with array operations. Only
+the games in which those deductions get stuck are rebuilt as a
+MinesweeperGame and handed to a HybridSolver, which finds what the single
+numbers do not show or, failing that, guesses.
+
+Requires NumPy.
+
+functions
+    simulate() - play many games in batches and return the number won
+
+classes
+    BatchGames - games played in lockstep
+"""
+
+from game import MinesweeperGame
+from solve import HybridSolver
+from transposition import TranspositionTable
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+class BatchGames():
+    """
+    Many games of minesweeper with the same dimensions, played in lockstep.
+
+    Board arrays have shape (num_games,) + dimensions. The mines of every
+    game are placed up front, none of them at or next to first_move, as
+    MinesweeperGame does for the first square revealed. Moves in games that
+    are over are ignored.
+
+    Methods
+        reveal() -- reveal squares in every game, with the automatic reveals
+        deduce() -- apply the single number deductions in every game
+        play_out() -- play every game to the end, return the number won
+        game() -- return one game as a MinesweeperGame
+    """
+
+    def __init__(self,num_games,dimensions = (30,16),num_mines = -1,
+        first_move = None,rng = None):
+        self.dimensions = tuple(dimensions)
+        self.num_games = num_games
+        self.first_move = tuple(first_move) if first_move is not None \
+            else tuple(dim // 2 for dim in self.dimensions)
+        rng = rng if rng is not None else np.random.default_rng()
+
+        num_squares = int(np.prod(self.dimensions))
+        if num_mines < 0:
+            num_mines = int(num_squares/5)
+        self.num_mines = num_mines
+        self.num_free = num_squares - num_mines
+
+        # offsets of the neighbors of a square in a board padded by one
+        # square on every side
+        center = (1,)*len(self.dimensions)
+        self.offsets = [offset for offset
+            in itertools.product((0,1,2),repeat = len(self.dimensions))
+            if offset != center]
+
+        freebies = np.zeros(self.dimensions,dtype = bool)
+        freebies[tuple(slice(max(coord - 1,0),coord + 2)
+            for coord in self.first_move)] = True
+        if num_mines > num_squares - freebies.sum():
+            raise ValueError('too many mines for the board')
+
+        # each game takes the num_mines squares with the smallest random
+        # keys, freebies get keys that are never the smallest
+        keys = rng.random((num_games,num_squares))
+        keys[:,freebies.ravel()] = 2.0
+        chosen = np.argpartition(keys,num_mines - 1,axis = 1)[:,:num_mines] \
+            if num_mines else np.zeros((num_games,0),dtype = int)
+        mines = np.zeros((num_games,num_squares),dtype = bool)
+        np.put_along_axis(mines,chosen,True,axis = 1)
+
+        shape = (num_games,) + self.dimensions
+        self.mines = mines.reshape(shape)
+        self.numbers = self._neighbor_sum(self.mines)
+        self.revealed = np.zeros(shape,dtype = bool)
+        self.flagged = np.zeros(shape,dtype = bool)
+        self.lost = np.zeros(num_games,dtype = bool)
+        self.won = np.zeros(num_games,dtype = bool)
+
+        # maps the games that have been stuck and are not over to a
+        # MinesweeperGame and a HybridSolver for them, with the revealed
+        # and flagged squares of the game as of the last time it was stuck
+        self.solvers = {}
+
+    def reveal(self,squares):
+        """Reveal the squares set in a boolean array of the board shape
+
+            Squares with no surrounding mines reveal their neighbors, as in
+            MinesweeperGame.reveal, for all games together: the squares
+            revealed in one step are dilated by one square and masked by
+            the squares still blank, until no square is added.
+        """
+        new = squares & ~self.revealed & ~self.flagged & self._in_play()
+        while new.any():
+            self.revealed |= new
+            self.lost |= self._per_game(new & self.mines).any(axis = 1)
+
+            empty = new & (self.numbers == 0) & ~self.mines
+            if not empty.any():
+                break
+            new = self._dilate(empty) & ~self.revealed & ~self.flagged
+
+        revealed = self._per_game(self.revealed).sum(axis = 1)
+        self.won |= ~self.lost & (revealed == self.num_free)
+
+    def deduce(self):
+        """Apply the deductions that follow from a single number
+
+            A revealed square whose number equals its flagged neighbors has
+            only free blank neighbors, and one whose number equals its
+            flagged and blank neighbors together has only mined ones. These
+            are applied to every game at once until none are left.
+
+            Returns:
+                a boolean array, True for the games in which a move was made
+        """
+        progress = np.zeros(self.num_games,dtype = bool)
+        while True:
+            blank = ~self.revealed & ~self.flagged
+            num_blank = self._neighbor_sum(blank)
+            num_needed = self.numbers - self._neighbor_sum(self.flagged)
+            fringe = self.revealed & (num_blank > 0) & self._in_play()
+
+            free = self._dilate(fringe & (num_needed == 0)) & blank
+            mined = self._dilate(fringe & (num_needed == num_blank)) & blank
+
+            moved = self._per_game(free | mined).any(axis = 1)
+            if not moved.any():
+                return progress
+            progress |= moved
+
+            self.flagged |= mined
+            self.reveal(free)
+
+    def play_out(self):
+        """Play every game to the end, return the number of games won
+
+            The first move is revealed in every game, then the single number
+            deductions are applied to all games, and each game in which they
+            get stuck makes one move chosen by a HybridSolver, until every
+            game is over.
+        """
+        first = np.zeros(self.revealed.shape,dtype = bool)
+        first[(slice(None),) + self.first_move] = True
+        self.reveal(first)
+
+        while True:
+            self.deduce()
+            stuck = np.flatnonzero(~(self.lost | self.won))
+            if not len(stuck):
+                return int(self.won.sum())
+
+            flags = np.zeros(self.revealed.shape,dtype = bool)
+            reveals = np.zeros(self.revealed.shape,dtype = bool)
+            for index in stuck:
+                solver = self._solver(index)
+                (mines,free) = solver.solve()
+                if not mines and not free:
+                    free = [solver.guess()]
+
+                for point in mines:
+                    flags[(index,) + tuple(point)] = True
+                for point in free:
+                    reveals[(index,) + tuple(point)] = True
+
+            self.flagged |= flags & ~self.revealed
+            self.reveal(reveals)
+
+            for index in np.flatnonzero(self.lost | self.won):
+                self.solvers.pop(index,None)
+
+    def game(self,index):
+        """Return game index as a MinesweeperGame in its current state"""
+        # tolist() gives plain ints, as the points of a game are
+        points = lambda array: map(tuple,np.argwhere(array).tolist())
+        game = MinesweeperGame(dimensions = self.dimensions,
+            mines = list(points(self.mines[index])))
+        game.apply_moves(
+            [(point,'reveal') for point in points(self.revealed[index])] +
+            [(point,'flag') for point in points(self.flagged[index])])
+        return game
+
+    def _solver(self,index):
+        # Return the HybridSolver of a stuck game. A game and its solver
+        # are built the first time the game gets stuck, and kept in step
+        # with the arrays afterwards by replaying the moves made since
+        # through the game, so that the solver sees them.
+        if index not in self.solvers:
+            game = self.game(index)
+            solver = HybridSolver(game)
+        else:
+            (game,solver,revealed,flagged) = self.solvers[index]
+            points = lambda array: map(tuple,np.argwhere(array).tolist())
+            for point in points(self.flagged[index] & ~flagged):
+                game.place_flag(point)
+            for point in points(self.revealed[index] & ~revealed):
+                # squares revealed around empty squares are skipped
+                game.reveal(point)
+
+        self.solvers[index] = (game,solver,self.revealed[index].copy(),
+            self.flagged[index].copy())
+        return solver
+
+    def _in_play(self):
+        # games that are not over, broadcastable against board arrays
+        return ~(self.lost | self.won).reshape(
+            (self.num_games,) + (1,)*len(self.dimensions))
+
+    def _per_game(self,array):
+        return array.reshape(self.num_games,-1)
+
+    def _neighbor_sum(self,array):
+        # for each square of each game, the sum of array over its neighbors
+        padded = np.pad(array.astype(np.int8),
+            [(0,0)] + [(1,1)]*len(self.dimensions))
+        total = np.zeros(array.shape,dtype = np.int8)
+        for offset in self.offsets:
+            total += padded[(slice(None),) + tuple(slice(start,start + dim)
+                for start,dim in zip(offset,self.dimensions))]
+        return total
+
+    def _dilate(self,array):
+        return self._neighbor_sum(array) > 0
+
+def simulate(num_games,dimensions = (30,16),num_mines = -1,first_move = None,
+    batch_size = 1000,seed = None):
+    """Play num_games games in batches of batch_size, return the number won
+
+        Each game that gets stuck keeps a MinesweeperGame and a HybridSolver
+        until it is over, about 100 KB on a hard board, so batch_size also
+        bounds the memory used.
+    """
+    rng = np.random.default_rng(seed)
+    won = 0
+    for start in range(0,num_games,batch_size):
+        batch = BatchGames(min(batch_size,num_games - start),dimensions,
+            num_mines,first_move,rng)
+        won += batch.play_out()
+    return won
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="measure the win rate of HybridSolver over many games "
+                    "simulated in lockstep")
+    parser.add_argument("-n","--num-games",
+                        type = int,
+                        default = 10000)
+    parser.add_argument("-l","--level",
+                        choices=['easy','medium','hard'],
+                        default = 'hard')
+    parser.add_argument("-b","--batch-size",
+                        type = int,
+                        default = 1000)
+    parser.add_argument("-s","--seed",
+                        type = int,
+                        default = None)
+    args = parser.parse_args()
+
+    dimensions = {'easy':(9,9),'medium':(16,16),'hard':(30,16)}[args.level]
+    num_mines = {'easy':10,'medium':40,'hard':99}[args.level]
+
+    start = time.perf_counter()
+    won = simulate(args.num_games,dimensions,num_mines,
+        batch_size = args.batch_size,seed = args.seed)
+    elapsed = time.perf_counter() - start
+    print('%d games, %d won (%.2f%%), in %.1fs, %.1f games/s' % (args.num_games,
+        won,100*won/args.num_games,elapsed,args.num_games/elapsed))
+
+    # keep what was solved for the next run, and for read only workers
+    TranspositionTable.default().save()
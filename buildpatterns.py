@@ -0,0 +1,47 @@
+from game import MinesweeperGame
+from solve import HybridSolver
+from patterns import PatternTable, DEFAULT_FILE
+from transposition import TranspositionTable
+from exceptions import *
+import argparse
+
+parser = argparse.ArgumentParser(
+    description="fill the pattern table used by PatternSolver by solving "
+                "every window reached in a number of random games")
+parser.add_argument("-n","--num-games",
+                    type = int,
+                    default = 1000)
+parser.add_argument("-l","--level",
+                    choices=['easy','medium','hard'],
+                    default = 'hard')
+parser.add_argument("-o","--output",
+                    default = DEFAULT_FILE,
+                    help="file to write the table to (the default is loaded by PatternSolver)")
+args = parser.parse_args()
+
+dimensions = {'easy':(9,9),'medium':(16,16),'hard':(30,16)}[args.level]
+table = PatternTable.default()
+
+for _ in range(args.num_games):
+    game = MinesweeperGame(dimensions = dimensions)
+    solver = HybridSolver(game,patterns = True)
+
+    try:
+        game.reveal(game.random_point())
+        (known_mines, known_free) = solver.solve()
+        while(known_mines or known_free):
+            for mine in known_mines:
+                game.place_flag(mine)
+            for free in known_free:
+                game.reveal(free)
+            (known_mines, known_free) = solver.solve()
+    except (GameWonException, GameLostException):
+        pass
+
+table.save(args.output)
+print(len(table), 'patterns written to', args.output)
+
+# the components solved along the way are kept for later runs as well
+transpositions = TranspositionTable.default()
+transpositions.save()
+print(len(transpositions), 'components written to', transpositions.filename)
@@ -0,0 +1,51 @@
+from game import MinesweeperGame
+from solve import HybridSolver
+from costmodel import CostModel, DEFAULT_FILE, FEATURES
+from transposition import TranspositionTable
+from exceptions import *
+import argparse
+
+parser = argparse.ArgumentParser(
+    description="fit the cost model used by HybridSolver to the cost of "
+                "enumerating every component reached in a number of random "
+                "games")
+parser.add_argument("-n","--num-games",
+                    type = int,
+                    default = 200)
+parser.add_argument("-l","--level",
+                    choices=['easy','medium','hard'],
+                    default = 'hard')
+parser.add_argument("-o","--output",
+                    default = DEFAULT_FILE,
+                    help="file to write the model to (the default is loaded by HybridSolver)")
+args = parser.parse_args()
+
+dimensions = {'easy':(9,9),'medium':(16,16),'hard':(30,16)}[args.level]
+num_mines = {'easy':10,'medium':40,'hard':99}[args.level]
+model = CostModel()
+
+for _ in range(args.num_games):
+    game = MinesweeperGame(dimensions = dimensions,num_mines = num_mines)
+    # every component is enumerated, whatever its estimated cost, and the
+    # table starts empty so that components are enumerated rather than found
+    solver = HybridSolver(game,table = TranspositionTable(),cost_model = model,
+        enumerate_limit = float('inf'))
+
+    try:
+        game.reveal(game.random_point())
+        while True:
+            (known_mines, known_free) = solver.solve()
+            if not known_mines and not known_free:
+                game.reveal(solver.guess())
+            for mine in known_mines:
+                game.place_flag(mine)
+            for free in known_free:
+                game.reveal(free)
+    except (GameWonException, GameLostException):
+        pass
+
+model.fit()
+model.save(args.output)
+print(len(model.samples), 'searches recorded, coefficients',
+    ', '.join('%s %.3f' % pair for pair in zip(FEATURES,model.coefficients)))
+print('model written to', args.output)
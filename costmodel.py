@@ -0,0 +1,153 @@
+"""
+Cost model for the components of the fringe searched by HybridSolver. The
+cost of enumerating the satisfactory placements of a component is measured
+in calls to ExhaustiveSolver._sphelper (nodes), and is estimated from
+features of the component: the log of the number of ways to satisfy each of
+its constraints on its own (an upper bound on the number of placements
+tried), its number of unknown points and its density of constraints.
+
+The log2 of the cost is modelled as a linear function of the features. The
+coefficients are fitted by least squares to the costs recorded while
+solving, see calibratecost.py, and stored in a JSON file.
+
+functions
+    component_features() - return the features of a component
+
+classes
+    CostModel - estimates search costs, calibrated from recorded statistics
+"""
+
+import collections
+import json
+import math
+import os
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    'costmodel.json')
+
+FEATURES = ['constant','log_combinations','num_unknowns','density']
+
+# fitted to 200 hard games (see calibratecost.py), used until a model file
+# is written
+DEFAULT_COEFFICIENTS = [1.26,-0.05,0.39,0.83]
+
+def component_features(game,constraints,unknowns):
+    """Return the features of a component, in the order of FEATURES
+
+        Args:
+            game (MinesweeperGame) -- the game the component belongs to
+            constraints (dict) -- maps each revealed point of the component
+                to the number of unflagged mines around it
+            unknowns (collection) -- the unrevealed, unflagged points of the
+                component
+    """
+    log_combinations = 0.0
+    for point,num_needed in constraints.items():
+        num_blank = len(list(game.blank_neighbors(point)))
+        if 0 < num_needed < num_blank:
+            log_combinations += math.log2(math.comb(num_blank,num_needed))
+
+    num_unknowns = len(unknowns)
+    density = len(constraints)/num_unknowns if num_unknowns else 0.0
+    return [1.0,log_combinations,float(num_unknowns),density]
+
+class CostModel():
+    """
+    Estimates the number of nodes needed to enumerate a component.
+
+    Methods
+        estimate() -- return the estimated number of nodes for some features
+        record() -- note the number of nodes a search actually took
+        fit() -- fit the coefficients to the recorded searches
+        load() -- read coefficients and samples from a file
+        save() -- write coefficients and samples to a file
+        default() -- return the model shared by all solvers in this process
+    """
+
+    _default = None
+
+    def __init__(self,filename = None,coefficients = None,max_samples = 100000):
+        self.filename = filename
+        self.coefficients = list(coefficients or DEFAULT_COEFFICIENTS)
+        self.samples = collections.deque(maxlen = max_samples)
+
+        if filename and os.path.exists(filename):
+            self.load(filename)
+
+    def estimate(self,features):
+        log_nodes = sum(c*f for c,f in zip(self.coefficients,features))
+        # log_nodes is unbounded for unusual components, do not overflow
+        return 2**min(log_nodes,1000.0)
+
+    def record(self,features,nodes):
+        self.samples.append((list(features),max(nodes,1)))
+
+    def fit(self):
+        """Fit the coefficients to the recorded samples by least squares
+
+            A small ridge term keeps the fit defined when a feature does
+            not vary across the samples. Raises ValueError if there are
+            fewer samples than features.
+        """
+        size = len(FEATURES)
+        if len(self.samples) < size:
+            raise ValueError('need at least %d samples to fit' % size)
+
+        # normal equations (X^T X + ridge I) w = X^T y
+        lhs = [[0.0]*size for _ in range(size)]
+        rhs = [0.0]*size
+        for features,nodes in self.samples:
+            target = math.log2(nodes)
+            for i in range(size):
+                rhs[i] += features[i]*target
+                for j in range(size):
+                    lhs[i][j] += features[i]*features[j]
+        for i in range(size):
+            lhs[i][i] += 1e-6*len(self.samples)
+
+        self.coefficients = _solve_linear(lhs,rhs)
+
+    def load(self,filename):
+        with open(filename) as file:
+            data = json.load(file)
+        if data.get('features') != FEATURES:
+            raise ValueError(filename + ' is not a cost model for these features')
+        self.coefficients = data['coefficients']
+        for features,nodes in data.get('samples',[]):
+            self.record(features,nodes)
+
+    def save(self,filename = None):
+        filename = filename or self.filename
+        data = {'features':FEATURES,
+                'coefficients':self.coefficients,
+                'samples':list(self.samples)}
+        # write to a temporary file first so that readers never see a
+        # partially written model
+        tmpname = filename + '.tmp'
+        with open(tmpname,'w') as file:
+            json.dump(data,file)
+        os.replace(tmpname,filename)
+
+    @classmethod
+    def default(cls):
+        """Return the shared model, backed by DEFAULT_FILE"""
+        if cls._default is None:
+            cls._default = cls(DEFAULT_FILE)
+        return cls._default
+
+def _solve_linear(lhs,rhs):
+    # Gaussian elimination with partial pivoting, for the few unknowns of
+    # the normal equations
+    size = len(rhs)
+    rows = [list(row) + [value] for row,value in zip(lhs,rhs)]
+    for col in range(size):
+        pivot = max(range(col,size),key=lambda r: abs(rows[r][col]))
+        rows[col],rows[pivot] = rows[pivot],rows[col]
+        if rows[col][col] == 0:
+            raise ValueError('singular system')
+        for r in range(size):
+            if r != col:
+                factor = rows[r][col]/rows[col][col]
+                for c in range(col,size + 1):
+                    rows[r][c] -= factor*rows[col][c]
+    return [rows[i][size]/rows[i][i] for i in range(size)]
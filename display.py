@@ -1,5 +1,10 @@
 from exceptions import *
-import pygame
+import itertools
+import os
+
+# pygame is only imported, and SDL only started, once a graphic display is
+# created (see init_pygame), so that the console displays do not need it
+pygame = None
 
 class Minesweeper2dConsoleDisplay():
 
@@ -18,13 +23,9 @@ class Minesweeper2dConsoleDisplay():
         max_x = self.game.dimensions[0]
         max_y = self.game.dimensions[1]
 
-        char_rep = self._char_representation_game_over if self.game.is_over else self._char_representation_in_play
-
         game_rows = []
         for y in range(max_y):
-            row = ''.join([char_rep((x,y)) for x in range(max_x)])
-
-            game_rows.append(row + '\n')
+            game_rows.append(self._row_as_string(y,range(max_x)) + '\n')
 
         return ''.join(game_rows)
 
@@ -32,7 +33,40 @@ class Minesweeper2dConsoleDisplay():
         self.known_mines = mines
         self.known_free = free
 
+    def _row_as_string(self, y, x_range):
+        # Build the characters for points (x,y), x in x_range, in one pass
+        # over the squares of the grid. Equivalent to calling
+        # _char_representation_game_over or _char_representation_in_play
+        # on each point, only much faster.
+        grid = self.game.grid
+        chars = []
 
+        if self.game.is_over:
+            for x in x_range:
+                square = grid[x][y]
+                if square.contains_mine:
+                    chars.append('F' if square.is_flagged else 'm')
+                elif square.is_flagged:
+                    chars.append('x')
+                else:
+                    chars.append(DIGITS[square.num_surrounding])
+        else:
+            known_mines = self.known_mines
+            known_free = self.known_free
+            for x in x_range:
+                square = grid[x][y]
+                if square.is_flagged:
+                    chars.append('f')
+                elif square.is_revealed:
+                    chars.append(DIGITS[square.num_surrounding])
+                elif (x,y) in known_mines:
+                    chars.append('m')
+                elif (x,y) in known_free:
+                    chars.append('b')
+                else:
+                    chars.append('#')
+
+        return ''.join(chars)
 
     def _char_representation_in_play(self, point):
         if self.game.is_flagged(point):
@@ -64,17 +98,251 @@ class Minesweeper2dConsoleDisplay():
         else:
             return str(self.game.num_mines_surrounding(point))
 
+DIGITS = '012345678'
+
+class MinesweeperAnsiConsoleDisplay(Minesweeper2dConsoleDisplay):
+    """
+    Console display for very large boards, using ANSI escape codes.
+
+    Only a viewport of the board is shown, by default as much of the board
+    as fits in the terminal. display_game() draws the whole viewport once;
+    after that refresh() redraws only the squares changed by moves (which
+    the display is notified of as a move protocol of the game), moving the
+    cursor to each run of changed squares instead of printing the board
+    again.
+
+    Methods
+        display_game() -- clear the terminal and draw the whole viewport
+        refresh() -- redraw the squares changed since the last draw
+        scroll() -- move the viewport and redraw it
+        show_algorithm() -- watch a solver play the game
+    """
+
+    def __init__(self,game,viewport = None,out = None):
+        super().__init__(game)
+        if len(self.game.dimensions) != 2:
+            raise ValueError('MinesweeperAnsiConsoleDisplay only works with 2D games')
+
+        import sys
+        self.out = out or sys.stdout
+
+        if viewport is None:
+            import shutil
+            columns,lines = shutil.get_terminal_size()
+            # leave a line for the header and one for the cursor
+            viewport = (0,0,columns,lines - 2)
+        self.viewport = self._clip_viewport(*viewport)
+
+        self.dirty = set([])
+        self.game.add_move_protocol(self.move_protocol)
+
+    def move_protocol(self,point,move_type):
+        self.dirty.add(point)
+
+    def reset_known(self, mines = set([]), free = set([])):
+        self.dirty.update(self.known_mines,self.known_free,mines,free)
+        super().reset_known(mines,free)
+
+    def display_game(self):
+        (x0,y0,width,height) = self.viewport
+        x_range = range(x0,x0 + width)
+
+        lines = ['\x1b[2J\x1b[H',self._header()]
+        for y in range(y0,y0 + height):
+            lines.append('\n' + self._row_as_string(y,x_range))
+        lines.append(self._park_cursor())
+
+        self.out.write(''.join(lines))
+        self.out.flush()
+        self.dirty = set([])
+
+    def refresh(self):
+        if not self.dirty:
+            return
+        if self.game.is_over:
+            # every unrevealed square may change when the game ends
+            self.display_game()
+            return
+
+        (x0,y0,width,height) = self.viewport
+        visible = [(y,x) for (x,y) in self.dirty
+            if x0 <= x < x0 + width and y0 <= y < y0 + height]
+        self.dirty = set([])
+        if not visible:
+            return
+        visible.sort()
+
+        # group changed squares into runs of adjacent squares in a row,
+        # each run is drawn after a single cursor move
+        commands = []
+        start = 0
+        for index in range(1,len(visible) + 1):
+            if index == len(visible) or visible[index] != \
+                    (visible[index - 1][0],visible[index - 1][1] + 1):
+                (y,x) = visible[start]
+                run_end = visible[index - 1][1] + 1
+                commands.append('\x1b[%d;%dH' % (y - y0 + 2,x - x0 + 1))
+                commands.append(self._row_as_string(y,range(x,run_end)))
+                start = index
+        commands.append(self._park_cursor())
+
+        self.out.write(''.join(commands))
+        self.out.flush()
+
+    def scroll(self,dx,dy):
+        (x0,y0,width,height) = self.viewport
+        self.viewport = self._clip_viewport(x0 + dx,y0 + dy,width,height)
+        self.display_game()
+
+    @classmethod
+    def show_algorithm(cls,game,solverclass,viewport = None):
+        disp = cls(game,viewport = viewport)
+        solver = solverclass(game)
+
+        try:
+            if game.num_revealed < 1:
+                game.reveal(game.random_point())
+            disp.display_game()
+
+            (known_mines, known_free) = solver.solve()
+
+            while(known_mines or known_free):
+                for mine in known_mines:
+                    game.place_flag(mine)
+
+                for free in known_free:
+                    game.reveal(free)
+
+                disp.refresh()
+                (known_mines,known_free) = solver.solve()
+        except(GameWonException, GameLostException):
+            pass
+
+        disp.refresh()
+
+    def _clip_viewport(self,x0,y0,width,height):
+        max_x,max_y = self.game.dimensions
+        width = max(1,min(width,max_x))
+        height = max(1,min(height,max_y))
+        x0 = max(0,min(x0,max_x - width))
+        y0 = max(0,min(y0,max_y - height))
+        return (x0,y0,width,height)
+
+    def _header(self):
+        (x0,y0,width,height) = self.viewport
+        header = 'x %d-%d, y %d-%d of %dx%d' % (x0,x0 + width - 1,y0,
+            y0 + height - 1,self.game.dimensions[0],self.game.dimensions[1])
+        return header[:width].ljust(width,'_')
+
+    def _park_cursor(self):
+        # move the cursor below the viewport
+        return '\x1b[%d;1H' % (self.viewport[3] + 2)
+
 
 SQUARE_WIDTH = 16 # pixels, based on sprites
 BLACK = (0,0,0)
 GREY =  (192,192,192)
 
+# widths in pixels that a square can be zoomed to
+ZOOM_LEVELS = [1,2,4,8,16,24,32,48,64]
+
+# the smallest width at which sprites are drawn and a board is first shown;
+# below it each square is drawn as the average colour of its sprite
+READABLE_WIDTH = 8
+
+SPRITE_NAMES = list(map(str,range(9)))
+SPRITE_NAMES.extend(['blank','flag','mine','goodflag','badflag','boom'])
+
+# converted sprite atlases shared by all displays, keyed by colorscheme
+_atlas_cache = {}
+
+def init_pygame(headless = False):
+    """Import and initialize pygame, if that has not been done yet
+
+        Args:
+            headless (bool) -- if True, (re)start the display module with
+                SDL's dummy video driver, which needs no screen at all
+    """
+    global pygame
+    if pygame is None:
+        import pygame as module
+        pygame = module
+
+    if headless and os.environ.get('SDL_VIDEODRIVER') != 'dummy':
+        pygame.display.quit()
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        _atlas_cache.clear()
+
+    if not pygame.get_init() or not pygame.display.get_init():
+        # surfaces converted for a previous display may not match the
+        # pixel format of the next one
+        _atlas_cache.clear()
+        pygame.init()
+
+def converted_sprite_atlas(colorscheme):
+    """Return load_sprite_atlas(colorscheme), converted to the display's format
+
+        The atlas is loaded once per process and colorscheme. A display mode
+        must have been set before calling this.
+    """
+    if colorscheme not in _atlas_cache:
+        (atlas,rects) = load_sprite_atlas(colorscheme)
+        # the sprites are opaque, so convert() rather than convert_alpha()
+        _atlas_cache[colorscheme] = (atlas.convert(),rects)
+    return _atlas_cache[colorscheme]
+
+def load_sprite_atlas(colorscheme):
+    """Load the sprites of colorscheme into a single surface
+
+        Returns:
+            (atlas,rects)
+                atlas -- a pygame Surface with all sprites side by side
+                rects -- a dict mapping each name in SPRITE_NAMES to the Rect
+                    of the atlas holding that sprite
+    """
+    init_pygame()
+    atlas = pygame.Surface((SQUARE_WIDTH*len(SPRITE_NAMES),SQUARE_WIDTH),
+        pygame.SRCALPHA)
+    rects = {}
+
+    for index,name in enumerate(SPRITE_NAMES):
+        file = 'sprites/' + colorscheme + '/' + name + '.png'
+        rects[name] = atlas.blit(pygame.image.load(file),
+            (index*SQUARE_WIDTH,0))
+
+    return (atlas,rects)
+
 class MinesweeperGraphicDisplay():
-    pygame.init()
 
-    def __init__(self,game,colorscheme='monokai'):
-        self.sprites = {}
-        self._load_sprites(colorscheme)
+    def __init__(self,game,colorscheme='monokai',fps=60,headless=False,
+        viewport=None):
+        init_pygame(headless)
+        self.headless = headless
+        self.colorscheme = colorscheme
+
+        # an optional recorder (see the replay module) notified of every
+        # square blitted and of the end of every frame
+        self.recorder = None
+
+        # Squares changed by moves are blitted right away, but the screen is
+        # only updated once per frame, with all rects dirtied since the last
+        # update. fps caps the number of frames per second.
+        self.fps = fps
+        self.dirty_rects = []
+        self.last_flush = 0
+
+        # set by pan and zoom, the whole view is then redrawn by the next
+        # flush, so that a burst of view events costs a single redraw
+        self.view_changed = False
+
+        # the average colour of each square's sprite, made the first time
+        # the board is drawn below READABLE_WIDTH and kept up to date by
+        # blit_square, see _render_colours
+        self.colours = None
+        self.colours_over = False
+
+        # set while a worker thread makes the moves, see solve_in_background
+        self.move_queue = None
 
         self.game = game
         if len(self.game.dimensions) != 2:
@@ -83,33 +351,80 @@ class MinesweeperGraphicDisplay():
         pygame.display.set_caption('Minesweeper')
         screenwidth = SQUARE_WIDTH * self.game.dimensions[0]
         screenlength = SQUARE_WIDTH * self.game.dimensions[1]
-        self.screen = pygame.display.set_mode((screenwidth,screenlength))
+
+        if viewport is None:
+            # boards larger than the screen get a viewport of 90% of it
+            info = pygame.display.Info()
+            if 0 < info.current_w < screenwidth or 0 < info.current_h < screenlength:
+                viewport = (int(0.9*info.current_w),int(0.9*info.current_h))
+
+        # The window shows the board scaled so that a square is
+        # square_width pixels wide, shifted so that the pixel origin of the
+        # scaled board is at the top left corner of the window.
+        self.square_width = SQUARE_WIDTH
+        self.origin = (0,0)
+        if viewport is None:
+            self.screen = pygame.display.set_mode((screenwidth,screenlength))
+        else:
+            self.screen = pygame.display.set_mode(viewport)
+            # large boards start at a readable width, the rest of the board
+            # is reached by panning or zooming out
+            fits = [width for width in ZOOM_LEVELS
+                if width*self.game.dimensions[0] <= viewport[0]
+                and width*self.game.dimensions[1] <= viewport[1]]
+            self.square_width = min(SQUARE_WIDTH,max(fits + [READABLE_WIDTH]))
+
+        # sprites are converted to the format of the screen, so they can
+        # only be loaded once the screen exists. Scaled copies are made for
+        # each square width as it is needed.
+        self.sprites = {}
+        self._load_sprites(colorscheme)
+        self.scaled_sprites = {SQUARE_WIDTH:self.sprites}
+        self.sprite_colours = {name:pygame.transform.average_color(sprite)[:3]
+            for name,sprite in self.sprites.items()}
 
         self.render_board()
         self.game.add_move_protocol(self.move_protocol)
 
     def _load_sprites(self,colorscheme):
-        names = list(map(str,range(9)))
-        names.extend(['blank','flag','mine','goodflag','badflag','boom'])
+        (atlas,rects) = converted_sprite_atlas(colorscheme)
+
+        for name in SPRITE_NAMES:
+            self.sprites[name] = atlas.subsurface(rects[name])
 
-        for name in names:
-            file = 'sprites/' + colorscheme + '/' + name + '.png'
-            self.sprites[name] = pygame.image.load(file)
-        
+    def _sprites_for_zoom(self):
+        if self.square_width not in self.scaled_sprites:
+            size = (self.square_width,self.square_width)
+            self.scaled_sprites[self.square_width] = {name:
+                pygame.transform.smoothscale(sprite,size).convert()
+                for name,sprite in self.sprites.items()}
+        return self.scaled_sprites[self.square_width]
+
+    def record(self,recorder):
+        """Start notifying recorder of every change to the board"""
+        self.recorder = recorder
+        recorder.begin(self.game.dimensions,self.colorscheme,
+            [self.sprite_name(point) for point in self.game.board_iterator()])
 
     @classmethod
-    def play_game(cls,game,colorscheme='monokai'):
-        disp = cls(game,colorscheme=colorscheme)
+    def play_game(cls,game,colorscheme='monokai',fps=60,viewport=None):
+        disp = cls(game,colorscheme=colorscheme,fps=fps,viewport=viewport)
 
         running = True
         while running:
-          for event in pygame.event.get():
+          # sleep until the player does something
+          for event in [pygame.event.wait()] + pygame.event.get():
             if event.type == pygame.QUIT:
               running = False
               pygame.quit()
+              return
+            elif disp.handle_view_event(event):
+                pass
             elif event.type == pygame.MOUSEBUTTONUP:
                 point = disp.pixel_to_point(event.pos)
-                if event.button == 1:
+                if point is None:
+                    pass
+                elif event.button == 1:
                     try:
                         disp.game.reveal(point)
                     except(GameWonException):
@@ -120,46 +435,293 @@ class MinesweeperGraphicDisplay():
                 elif event.button == 3:
                     disp.game.toggle_flag(point)
 
-    @classmethod
-    def show_algorithm(cls,game,solverclass,colorscheme='monokai'):
-        disp = cls(game,colorscheme=colorscheme)
-        solver = solverclass(game)
-
-        if game.num_revealed < 1:
-            game.reveal(game.random_point())
-        pygame.event.pump()
+          disp.flush(force=True)
 
-        (known_mines, known_free) = solver.solve()
+    @classmethod
+    def show_algorithm(cls,game,solverclass,colorscheme='monokai',fps=60,
+        headless=False,recorder=None,viewport=None):
+        disp = cls(game,colorscheme=colorscheme,fps=fps,headless=headless,
+            viewport=viewport)
+        if recorder:
+            disp.record(recorder)
+
+        if headless:
+            # nothing to keep responsive, so solve in this thread, which
+            # gives one recorded frame per batch of moves
+            solver = solverclass(game)
+            try:
+                if game.num_revealed < 1:
+                    game.reveal(game.random_point())
+
+                (known_mines, known_free) = solver.solve()
+
+                while(known_mines or known_free):
+                    for mine in known_mines:
+                        game.place_flag(mine)
+
+                    for free in known_free:
+                        game.reveal(free)
+
+                    disp.flush()
+                    (known_mines,known_free) = solver.solve()
+            except(GameWonException, GameLostException):
+                disp.render_board()
+
+            disp.flush(force=True)
+            pygame.display.quit()
+
+        elif disp.solve_in_background(solverclass):
+            disp.wait_for_quit()
+
+    def solve_in_background(self,solverclass):
+        """Let a solver play the game in a worker thread, animating its moves
+
+            The worker solves and applies one batch of moves after another
+            without waiting for the display. Its moves reach the display
+            through a queue (see move_protocol) and are drawn at most fps
+            times per second, so the window keeps handling events during a
+            long solve(), and the next solve() runs while the last batch is
+            still being drawn. Closing the window cancels the worker: an
+            exhaustive search in progress is stopped by tripping its
+            deadline (see ExhaustiveSolver), and the worker is joined
+            before returning.
+
+            Returns:
+                bool -- False if the window was closed (pygame has then been
+                    quit), True once all moves of the worker are drawn
+        """
+        import queue
+        import threading
+
+        self.move_queue = queue.SimpleQueue()
+        cancelled = threading.Event()
+        game = self.game
 
-        while(known_mines or known_free):
+        solver = solverclass(game)
+        # the exhaustive searches of the solver, stopped when cancelled
+        searches = [search for search in (solver,getattr(solver,'esolver',None))
+            if hasattr(search,'deadline')]
+
+        def work():
+            try:
+                if game.num_revealed < 1:
+                    game.reveal(game.random_point())
+
+                progress = True
+                while progress and not cancelled.is_set():
+                    # apply deductions as soon as the solver proves them
+                    progress = False
+                    for (known_mines,known_free) in solver.solve_iter():
+                        progress = True
+                        for mine in known_mines:
+                            game.place_flag(mine)
+
+                        for free in known_free:
+                            game.reveal(free)
+
+                        if cancelled.is_set():
+                            break
+            except(GameWonException, GameLostException, SearchLimitException):
+                pass
+
+        worker = threading.Thread(target=work,daemon=True)
+        worker.start()
+
+        clock = pygame.time.Clock()
+        while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    cancelled.set()
+                    for search in searches:
+                        search.deadline = 0
+                    worker.join()
                     pygame.quit()
-                    return
+                    return False
+                self.handle_view_event(event)
 
-            for mine in known_mines:
-                game.place_flag(mine)
+            finished = not worker.is_alive()
+            while not self.move_queue.empty():
+                rect = self.blit_square(self.move_queue.get())
+                if rect:
+                    self.dirty_rects.append(rect)
 
-            for free in known_free:
-                game.reveal(free)
+            if finished:
+                break
+            self.flush(force=True)
+            clock.tick(self.fps)
 
-            (known_mines,known_free) = solver.solve()
-        while(True):
-            for event in pygame.event.get():
+        self.move_queue = None
+        if self.game.is_over:
+            self.render_board()
+        self.flush(force=True)
+        return True
+
+    def wait_for_quit(self):
+        """Sleep until the window is closed, then quit pygame"""
+        while True:
+            for event in [pygame.event.wait()] + pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     return
-            
-
-
-
-            
-    def render_board(self):
-        for point in self.game.board_iterator():
-            self.blit_square(point)
+                self.handle_view_event(event)
+            self.flush(force=True)
+
+    def handle_view_event(self,event):
+        """Pan or zoom the view in response to event, if it is one of
+
+            arrow keys -- pan by a quarter of the window
+            mouse wheel -- zoom in or out around the mouse
+            middle button drag -- pan with the mouse
+
+            Returns:
+                bool -- True if the event was handled
+        """
+        (width,height) = self.screen.get_size()
+        if event.type == pygame.KEYDOWN:
+            steps = {pygame.K_LEFT:(-width//4,0),pygame.K_RIGHT:(width//4,0),
+                pygame.K_UP:(0,-height//4),pygame.K_DOWN:(0,height//4)}
+            if event.key in steps:
+                self.pan(*steps[event.key])
+                return True
+        elif event.type == pygame.MOUSEWHEEL:
+            self.zoom(event.y,pygame.mouse.get_pos())
+            return True
+        elif event.type == pygame.MOUSEMOTION and event.buttons[1]:
+            self.pan(-event.rel[0],-event.rel[1])
+            return True
+        elif event.type in (pygame.MOUSEBUTTONDOWN,pygame.MOUSEBUTTONUP) \
+                and event.button == 2:
+            return True
+        return False
+
+    def pan(self,dx,dy):
+        """Move the view dx,dy pixels, it is redrawn by the next flush"""
+        self.origin = self._clip_origin(self.origin[0] + dx,self.origin[1] + dy)
+        self.view_changed = True
+
+    def zoom(self,steps,pixel=None):
+        """Zoom in (steps > 0) or out by steps levels of ZOOM_LEVELS
+
+            The point of the board under pixel (by default the center of the
+            window) stays where it is. The view is redrawn by the next flush.
+        """
+        if pixel is None:
+            pixel = (self.screen.get_width()//2,self.screen.get_height()//2)
+
+        levels = [width for width in ZOOM_LEVELS if width <= self.square_width]
+        index = max(0,min(len(levels) - 1 + steps,len(ZOOM_LEVELS) - 1))
+        square_width = ZOOM_LEVELS[index]
+        if square_width == self.square_width:
+            return
+
+        # board position under pixel, in units of squares
+        bx = (pixel[0] + self.origin[0])/self.square_width
+        by = (pixel[1] + self.origin[1])/self.square_width
+        self.square_width = square_width
+        self.origin = self._clip_origin(int(bx*square_width) - pixel[0],
+            int(by*square_width) - pixel[1])
+        self.view_changed = True
+
+    def _clip_origin(self,x,y):
+        (width,height) = self.screen.get_size()
+        max_x = self.square_width*self.game.dimensions[0] - width
+        max_y = self.square_width*self.game.dimensions[1] - height
+        return (max(0,min(x,max_x)),max(0,min(y,max_y)))
+
+    def visible_points(self):
+        """Return an iterator over the points shown in the window"""
+        (width,height) = self.screen.get_size()
+        (ox,oy) = self.origin
+        x_range = range(ox//self.square_width,
+            min(self.game.dimensions[0],(ox + width - 1)//self.square_width + 1))
+        y_range = range(oy//self.square_width,
+            min(self.game.dimensions[1],(oy + height - 1)//self.square_width + 1))
+        return itertools.product(x_range,y_range)
+
+    def flush(self,force=False):
+        """Update the parts of the screen changed since the last update
+
+            The whole view is redrawn if it was panned or zoomed. Does
+            nothing if less than a frame (1/fps seconds) has passed since
+            the last update, unless force is True.
+        """
+        if self.recorder:
+            # recorded frames are not subject to the frame rate cap
+            self.recorder.end_frame()
+
+        if not self.dirty_rects and not self.view_changed:
+            return
+
+        now = pygame.time.get_ticks()
+        if not force and now - self.last_flush < 1000/self.fps:
+            return
+
+        if self.view_changed:
+            self.render_board(record=False)
+            return
+
+        pygame.display.update(self.dirty_rects)
+        self.dirty_rects = []
+        self.last_flush = now
+
+    def render_board(self,record=True):
+        if self.recorder and record:
+            for point in self.game.board_iterator():
+                self.recorder.record(point,self.sprite_name(point))
+            self.recorder.end_frame()
+
+        self.screen.fill(BLACK)
+        if self.square_width < READABLE_WIDTH:
+            self._render_colours()
+        else:
+            sprites = self._sprites_for_zoom()
+            (ox,oy) = self.origin
+            for point in self.visible_points():
+                pos = (point[0]*self.square_width - ox,
+                    point[1]*self.square_width - oy)
+                self.screen.blit(sprites[self.sprite_name(point)],pos)
         pygame.display.update()
-
-    def blit_square(self,point):
+        self.dirty_rects = []
+        self.view_changed = False
+        self.last_flush = pygame.time.get_ticks()
+
+    def _render_colours(self):
+        # Draw the view from the colour of each square, scaled up with
+        # NumPy and blitted as one surface, rather than blitting a sprite
+        # per square, which is far too slow for the number of squares
+        # shown at these widths
+        import numpy as np
+
+        if self.colours is None or self.colours_over != self.game.is_over:
+            if self.game.is_over:
+                # any square may show a mine or its number
+                points = list(self.game.board_iterator())
+            else:
+                # only revealed and flagged squares are not blank
+                touched = np.array([[square.is_revealed or square.is_flagged
+                    for square in column] for column in self.game.grid])
+                points = list(map(tuple,np.argwhere(touched).tolist()))
+
+            self.colours = np.empty(self.game.dimensions + (3,),dtype = np.uint8)
+            self.colours[...] = self.sprite_colours['blank']
+            if points:
+                self.colours[tuple(np.array(points).T)] = [self.sprite_colours[
+                    self.sprite_name(point)] for point in points]
+            self.colours_over = self.game.is_over
+
+        width = self.square_width
+        (ox,oy) = self.origin
+        (screen_width,screen_height) = self.screen.get_size()
+        (x0,y0) = (ox//width,oy//width)
+        (x1,y1) = ((ox + screen_width - 1)//width + 1,
+            (oy + screen_height - 1)//width + 1)
+        pixels = self.colours[x0:x1,y0:y1].repeat(width,axis = 0) \
+            .repeat(width,axis = 1)
+        pixels = pixels[ox - x0*width:,oy - y0*width:][:screen_width,:screen_height]
+        self.screen.blit(pygame.surfarray.make_surface(pixels),(0,0))
+
+    def sprite_name(self,point):
+        """Return the name of the sprite showing the square at point"""
         revealed = self.game.is_revealed(point)
         flagged = self.game.is_flagged(point)
 
@@ -167,36 +729,60 @@ class MinesweeperGraphicDisplay():
             mined = self.game.contains_mine(point)
             
             if mined and revealed:
-                sprite = self.sprites['boom']
+                return 'boom'
             elif mined and flagged:
-                sprite = self.sprites['goodflag']
+                return 'goodflag'
             elif mined:
-                sprite = self.sprites['mine']
+                return 'mine'
             elif flagged:
-                sprite = self.sprites['badflag']
+                return 'badflag'
             else:
-                sprite = self.sprites[str(self.game.num_mines_surrounding(point))]
+                return str(self.game.num_mines_surrounding(point))
 
         else:
             if revealed:
-                sprite = self.sprites[str(self.game.num_mines_surrounding(point))]
+                return str(self.game.num_mines_surrounding(point))
             elif flagged:
-                sprite = self.sprites['flag']
+                return 'flag'
             else:
-                sprite = self.sprites['blank']
-
-        pos = (point[0]*SQUARE_WIDTH, point[1]*SQUARE_WIDTH)
+                return 'blank'
 
-        return self.screen.blit(sprite,pos)
+    def blit_square(self,point):
+        name = self.sprite_name(point)
+        if self.recorder:
+            self.recorder.record(point,name)
+        if self.colours is not None:
+            self.colours[point] = self.sprite_colours[name]
+
+        pos = (point[0]*self.square_width - self.origin[0],
+            point[1]*self.square_width - self.origin[1])
+        if pos[0] <= -self.square_width or pos[1] <= -self.square_width \
+                or pos[0] >= self.screen.get_width() \
+                or pos[1] >= self.screen.get_height():
+            # point is outside the view
+            return None
+
+        if self.square_width < READABLE_WIDTH:
+            return self.screen.fill(self.sprite_colours[name],
+                pos + (self.square_width,self.square_width))
+        return self.screen.blit(self._sprites_for_zoom()[name],pos)
 
     def move_protocol(self,point,move_type):
-        pygame.display.update(self.blit_square(point))
+        if self.move_queue is not None:
+            # the move was made by a worker thread, see solve_in_background
+            self.move_queue.put(point)
+        else:
+            rect = self.blit_square(point)
+            if rect:
+                self.dirty_rects.append(rect)
 
     def pixel_to_point(self,pixel):
-        #TODO, consider cases where the screen conists of more than the board
-        x = pixel[0] // SQUARE_WIDTH
-        y = pixel[1] // SQUARE_WIDTH
-        return (x,y)
+        """Return the point shown at pixel of the window, or None"""
+        x = (pixel[0] + self.origin[0]) // self.square_width
+        y = (pixel[1] + self.origin[1]) // self.square_width
+        if 0 <= x < self.game.dimensions[0] and 0 <= y < self.game.dimensions[1]:
+            return (x,y)
+        return None
 
     def save_board_image(self,filename):
         pygame.image.save(self.screen,filename)
@@ -8,4 +8,7 @@ class GameLostException(Exception):
     pass
 
 class GameNotOverException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class SearchLimitException(Exception):
+    pass
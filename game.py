@@ -31,6 +31,7 @@ class MinesweeperGame:
 			remove_flag() - remove flag from board
 			toggle_flag() - switch between flag or unflagged
 			reveal() - reveal square
+			apply_moves() - apply many moves at once, without notifications
 
 		Query Methods
 			is_flagged() - check if square is flagged
@@ -162,6 +163,42 @@ class MinesweeperGame:
 				self.reveal(neighb)
 			return
 
+	def apply_moves(self, moves):
+		"""Apply a sequence of moves in one batch
+
+		This is the fast path used to replay recorded games. Unlike the
+		move methods above, no move protocols are notified, no exceptions
+		are raised when the game is won or lost (is_over is still updated)
+		and revealing a square with no surrounding mines does not reveal its
+		neighbors, so every revealed square must be in moves.
+
+		Args:
+			moves (iterable) -- pairs (point, move_type) where move_type is
+				one of 'reveal', 'flag' and 'unflag'
+
+		Raises:
+			ValueError -- raised if the mines have not been placed yet
+		"""
+		if not self.mines_placed:
+			raise ValueError('can not apply moves before the mines are placed')
+
+		get_square = self._get_square
+		for point, move_type in moves:
+			square = get_square(point)
+			if move_type == 'reveal':
+				if not square.is_revealed:
+					square.is_revealed = True
+					self.num_revealed += 1
+					if square.contains_mine:
+						self.is_over = True
+			elif move_type == 'flag':
+				square.is_flagged = True
+			elif move_type == 'unflag':
+				square.is_flagged = False
+
+		if self.num_revealed == self.num_free:
+			self.is_over = True
+
 	#------------------------------------------------------------------------#
 	# The following methods are used to acquire certain information about a  #
 	# given point on the game board.                                         #
@@ -307,7 +344,9 @@ class MinesweeperGame:
 
 		self.mines = mines
 
-		if self.mines:
+		# an empty collection of mines is a board without mines, only None
+		# leaves the mines to be placed at the first move
+		if self.mines is not None:
 			self.mines = set(mines)
 			self.num_mines = len(mines)
 			self._place_mines()
@@ -373,18 +412,18 @@ class MinesweeperGame:
 				if rpoint not in freebies:
 					self.mines.add(rpoint)
 
+		# update num_surrounding field for each Square in the board, by
+		# counting each mine once for each of its neighbors rather than
+		# checking the neighbors of every square
+		for point in self.board_iterator():
+			self._get_square(point).num_surrounding = 0
+
 		for mine in self.mines:
 			square = self._get_square(mine)
 			square.contains_mine = True
 
-
-		# update num_surrounding field for each Square in the board
-		for point in self.board_iterator():
-			square = self._get_square(point)
-
-			adj_squares = [self._get_square(neighb) for neighb in self.neighbors(point)]
-
-			square.num_surrounding = [adj_square.contains_mine for adj_square in adj_squares].count(True)
+			for neighb in self.neighbors(mine):
+				self._get_square(neighb).num_surrounding += 1
 
 
 
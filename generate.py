@@ -0,0 +1,220 @@
+"""
+Generation of no-guess boards: boards that HybridSolver solves from the
+first move without ever having to guess. Mines are placed at random, then
+the board is played out by HybridSolver. When the solver gets stuck, the
+board is repaired locally by moving one mine from the squares in play to a
+square that nothing revealed so far touches, and play continues from where
+it stopped. Once no guess is needed, the repaired board is checked by
+playing it out again from the first move, since moving mines changes
+numbers that earlier deductions used. Boards that can not be repaired
+within a number of attempts are thrown away.
+
+Boards are generated in parallel by a pool of worker processes, each
+working from its own seed, and accepted boards are written to a corpus
+file with one JSON object per line. The workers open the shared
+transposition table read only.
+
+functions
+    generate_board() - generate one no-guess board from a seed
+    generate_corpus() - generate many boards in parallel
+    load_corpus() - iterate over the games in a corpus file
+"""
+
+from game import MinesweeperGame
+from solve import HybridSolver, is_in_play
+from transposition import TranspositionTable
+from exceptions import *
+
+import argparse
+import json
+import multiprocessing
+import random
+
+def place_mines(dimensions,num_mines,first_move,rng):
+    """Return num_mines random points, none of them at or next to first_move"""
+    game = MinesweeperGame(dimensions = dimensions)
+    freebies = set(game.neighbors(first_move))
+    freebies.add(first_move)
+    candidates = [point for point in game.board_iterator()
+        if point not in freebies]
+    return set(rng.sample(candidates,num_mines))
+
+def play_out(game,first_move = None):
+    """Let HybridSolver play game until it wins or gets stuck
+
+        Args:
+            game (MinesweeperGame) -- a game whose mines are placed
+            first_move (tuple of ints) -- revealed first if given
+
+        Returns:
+            bool -- True if the game was won without guessing
+    """
+    solver = HybridSolver(game)
+    try:
+        if first_move is not None:
+            game.reveal(first_move)
+
+        (known_mines,known_free) = solver.solve()
+        while(known_mines or known_free):
+            for mine in known_mines:
+                game.place_flag(mine)
+            for free in known_free:
+                game.reveal(free)
+            (known_mines,known_free) = solver.solve()
+    except GameWonException:
+        return True
+    except GameLostException:
+        # only possible if the solver is wrong
+        return False
+
+    return False
+
+def _repair(game,mines,rng):
+    # Move a mine in play to a square that is neither revealed nor next to
+    # a revealed square. Return the new set of mines, or None if there is
+    # no such move.
+    in_play_mines = [point for point in game.board_iterator()
+        if point in mines and is_in_play(game,point)]
+    hidden = [point for point in game.board_iterator()
+        if point not in mines and not game.is_revealed(point)
+        and not game.is_flagged(point) and not is_in_play(game,point)]
+
+    if not in_play_mines or not hidden:
+        return None
+
+    mines = set(mines)
+    mines.remove(rng.choice(in_play_mines))
+    mines.add(rng.choice(hidden))
+    return mines
+
+def _resume(dimensions,mines,game):
+    # Return a game with the given mines in the state of game. This is
+    # valid because a repair never moves mines to or from revealed or
+    # flagged squares.
+    resumed = MinesweeperGame(dimensions = dimensions,mines = mines)
+    resumed.apply_moves(
+        [(point,'reveal') for point in game.board_iterator()
+            if game.is_revealed(point)] +
+        [(point,'flag') for point in game.board_iterator()
+            if game.is_flagged(point)])
+    return resumed
+
+def generate_board(dimensions,num_mines,seed,first_move = None,
+    max_repairs = 50,max_attempts = 100):
+    """Generate a board that can be solved from first_move without guessing
+
+        Args:
+            dimensions (tuple of ints) -- dimensions of the board
+            num_mines (int) -- number of mines on the board
+            seed -- seed for the random number generator, the same seed
+                always gives the same board
+            first_move (tuple of ints) -- the first square revealed, the
+                center of the board by default
+            max_repairs (int) -- repairs tried before a board is thrown away
+            max_attempts (int) -- boards tried before giving up
+
+        Returns:
+            a dict with the dimensions, num_mines, first_move, mines (a
+            sorted list of points) and seed of the board, plus the number of
+            attempts and repairs it took, or None if no board was found
+    """
+    rng = random.Random(seed)
+    if first_move is None:
+        first_move = tuple(dim // 2 for dim in dimensions)
+
+    num_repairs = 0
+    for attempt in range(1,max_attempts + 1):
+        mines = place_mines(dimensions,num_mines,first_move,rng)
+        game = MinesweeperGame(dimensions = dimensions,mines = mines)
+        solved = play_out(game,first_move)
+        repaired = False
+
+        for _ in range(max_repairs + 1):
+            if solved and repaired:
+                # the repaired board must also be solvable from scratch
+                game = MinesweeperGame(dimensions = dimensions,mines = mines)
+                solved = play_out(game,first_move)
+
+            if solved:
+                return {'dimensions':list(dimensions),
+                        'num_mines':num_mines,
+                        'first_move':list(first_move),
+                        'mines':sorted(map(list,mines)),
+                        'seed':seed,
+                        'attempts':attempt,
+                        'repairs':num_repairs}
+
+            mines = _repair(game,mines,rng)
+            if mines is None:
+                break
+            num_repairs += 1
+            repaired = True
+            game = _resume(dimensions,mines,game)
+            solved = play_out(game)
+
+    return None
+
+def _generate_task(task):
+    (dimensions,num_mines,seed) = task
+    return generate_board(dimensions,num_mines,seed)
+
+def generate_corpus(filename,dimensions,num_mines,num_boards,seed = 0,
+    workers = None):
+    """Generate num_boards boards in parallel and append them to filename
+
+        Board i is generated from seed + i, so a corpus can be extended
+        by starting from a new seed. Returns the number of boards written.
+    """
+    tasks = [(tuple(dimensions),num_mines,seed + index)
+        for index in range(num_boards)]
+
+    written = 0
+    pool = multiprocessing.Pool(workers,
+        initializer = TranspositionTable.open_default,initargs = (True,))
+    with pool, open(filename,'a') as corpus:
+        for board in pool.imap_unordered(_generate_task,tasks):
+            if board is not None:
+                corpus.write(json.dumps(board) + '\n')
+                written += 1
+    return written
+
+def load_corpus(filename):
+    """Iterate over (game,first_move) pairs for the boards in a corpus"""
+    with open(filename) as corpus:
+        for line in corpus:
+            board = json.loads(line)
+            game = MinesweeperGame(dimensions = tuple(board['dimensions']),
+                mines = [tuple(mine) for mine in board['mines']])
+            yield (game,tuple(board['first_move']))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="generate boards that can be solved without guessing")
+    parser.add_argument("-l","--level",
+                        choices=['easy','medium','hard'],
+                        default = 'hard')
+    parser.add_argument("-m","--num-mines",
+                        type = int,
+                        default = None,
+                        help="number of mines (default: 10, 40 or 99 by level)")
+    parser.add_argument("-n","--num-boards",
+                        type = int,
+                        default = 100)
+    parser.add_argument("-s","--seed",
+                        type = int,
+                        default = 0)
+    parser.add_argument("-w","--workers",
+                        type = int,
+                        default = None,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument("-o","--output",
+                        default = 'corpus.jsonl',
+                        help="corpus file, boards are appended to it")
+    args = parser.parse_args()
+
+    dimensions = {'easy':(9,9),'medium':(16,16),'hard':(30,16)}[args.level]
+    num_mines = args.num_mines or {'easy':10,'medium':40,'hard':99}[args.level]
+
+    written = generate_corpus(args.output,dimensions,num_mines,
+        args.num_boards,seed = args.seed,workers = args.workers)
+    print(written,'boards written to',args.output)
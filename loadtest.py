@@ -0,0 +1,146 @@
+"""
+Load test client for server.py. Runs many simulated players at once, each
+playing games by asking the server for hints and guessing when there are
+none, and reports game throughput and hint latency percentiles.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+
+class Client():
+    """A connection to the server, shared by many players"""
+
+    def __init__(self,reader,writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.pending = {}
+        self.listener = asyncio.ensure_future(self._listen())
+
+    @classmethod
+    async def connect(cls,host,port,unix = None):
+        if unix:
+            (reader,writer) = await asyncio.open_unix_connection(unix)
+        else:
+            (reader,writer) = await asyncio.open_connection(host,port)
+        return cls(reader,writer)
+
+    async def request(self,**request):
+        request['id'] = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request['id']] = future
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        return await future
+
+    async def _listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            self.pending.pop(response['id']).set_result(response)
+
+    def close(self):
+        self.listener.cancel()
+        self.writer.close()
+
+async def play(client,dimensions,num_mines,latencies,rng):
+    """Play one game, return True if it was won"""
+    session = (await client.request(op = 'new',dimensions = dimensions,
+        num_mines = num_mines))['session']
+    unknown = set(itertools.product(*[range(dim) for dim in dimensions]))
+
+    async def move(op,point):
+        response = await client.request(op = op,session = session,
+            point = list(point))
+        for (x,y,move_type,number) in response['moves']:
+            unknown.discard((x,y))
+        return response
+
+    center = tuple(dim // 2 for dim in dimensions)
+    response = await move('reveal',center)
+
+    while not response['over']:
+        start = time.perf_counter()
+        hint = await client.request(op = 'hint',session = session)
+        latencies.append(time.perf_counter() - start)
+
+        if hint.get('mines') or hint.get('free'):
+            for point in hint['mines']:
+                response = await move('flag',point)
+            for point in hint['free']:
+                response = await move('reveal',point)
+                if response['over']:
+                    break
+        else:
+            response = await move('reveal',rng.choice(sorted(unknown)))
+
+    await client.request(op = 'close',session = session)
+    return response['won']
+
+async def player(clients,args,dimensions,latencies,results,seed):
+    rng = random.Random(seed)
+    for game_number in range(args.games):
+        client = clients[(seed + game_number) % len(clients)]
+        results.append(await play(client,dimensions,args.num_mines,
+            latencies,rng))
+
+async def main(args):
+    dimensions = {'easy':(9,9),'medium':(16,16),'hard':(30,16)}[args.level]
+    clients = [await Client.connect(args.host,args.port,args.unix)
+        for _ in range(args.connections)]
+
+    latencies = []
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*[player(clients,args,dimensions,latencies,results,
+        seed) for seed in range(args.players)])
+    elapsed = time.perf_counter() - start
+
+    for client in clients:
+        client.close()
+
+    latencies.sort()
+    percentile = lambda p: 1000*latencies[min(len(latencies) - 1,
+        int(p*len(latencies)))]
+    print('%d games (%d won) in %.2fs, %.1f games/s' % (len(results),
+        results.count(True),elapsed,len(results)/elapsed))
+    print('%d hints, %.1f hints/s, latency ms p50 %.2f p90 %.2f p99 %.2f max %.2f'
+        % (len(latencies),len(latencies)/elapsed,percentile(0.5),
+           percentile(0.9),percentile(0.99),1000*latencies[-1]))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="measure the throughput and hint latency of server.py")
+    parser.add_argument("--host",
+                        default = '127.0.0.1')
+    parser.add_argument("-p","--port",
+                        type = int,
+                        default = 8765)
+    parser.add_argument("-u","--unix",
+                        help="connect to this Unix socket instead of TCP")
+    parser.add_argument("-n","--players",
+                        type = int,
+                        default = 100,
+                        help="number of concurrent players (sessions)")
+    parser.add_argument("-g","--games",
+                        type = int,
+                        default = 5,
+                        help="games played by each player")
+    parser.add_argument("-c","--connections",
+                        type = int,
+                        default = 10)
+    parser.add_argument("-l","--level",
+                        choices=['easy','medium','hard'],
+                        default = 'hard')
+    parser.add_argument("-m","--num-mines",
+                        type = int,
+                        default = -1,
+                        help="number of mines (default: a fifth of the squares)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
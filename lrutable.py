@@ -0,0 +1,112 @@
+"""
+Size bounded, persistent mapping shared by the lookup tables of the
+solvers (see the patterns and transposition modules). Entries are kept in
+least recently used order and the oldest are evicted once the table is
+full. A table can be written to a file and read back, and each kind of
+table has one instance shared by all solvers in a process.
+
+classes
+    LRUTable - size bounded, persistent mapping from keys to values
+"""
+
+import collections
+import os
+import pickle
+import threading
+
+class LRUTable():
+    """
+    Size bounded mapping from keys to values, persistent in a file.
+
+    When the table holds more than max_entries entries the least recently
+    used ones are evicted (MAX_ENTRIES by default). A table opened with
+    read_only=True never writes its file, so that many worker processes
+    can share one file while a single writer saves it. Tables may be
+    shared by threads, get() and add() hold a lock. Subclasses set
+    DEFAULT_FILE and MAX_ENTRIES.
+
+    Methods
+        get() -- return the value stored for a key, or None
+        add() -- store the value for a key
+        load() -- add the entries stored in a file
+        save() -- write the table to a file
+        default() -- return the table shared by all solvers in this process
+        open_default() -- reopen the shared table, e.g. read only in workers
+    """
+
+    DEFAULT_FILE = None
+    MAX_ENTRIES = 100000
+
+    _default = None
+
+    def __init__(self,filename = None,max_entries = None,read_only = False):
+        self.filename = filename
+        self.max_entries = max_entries if max_entries is not None \
+            else self.MAX_ENTRIES
+        self.read_only = read_only
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+        if filename and os.path.exists(filename):
+            self.load(filename)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self,key):
+        # another thread may evict key between the lookup and the move
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def add(self,key,value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last = False)
+
+    def load(self,filename):
+        with open(filename,'rb') as file:
+            entries = pickle.load(file)
+        # tables used to be saved as a dict rather than a list of items
+        if isinstance(entries,dict):
+            entries = entries.items()
+        for key,value in entries:
+            self.add(key,value)
+
+    def save(self,filename = None):
+        if self.read_only:
+            raise PermissionError('can not save a read only table')
+
+        filename = filename or self.filename
+        # write to a temporary file first so that readers never see a
+        # partially written table
+        tmpname = filename + '.tmp'
+        with self.lock:
+            entries = list(self.entries.items())
+        with open(tmpname,'wb') as file:
+            pickle.dump(entries,file,
+                protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpname,filename)
+
+    @classmethod
+    def default(cls):
+        """Return the shared table, backed by DEFAULT_FILE"""
+        # looked up in the class itself, each subclass has its own table
+        if cls.__dict__.get('_default') is None:
+            cls._default = cls(cls.DEFAULT_FILE)
+        return cls._default
+
+    @classmethod
+    def open_default(cls,read_only = False):
+        """Replace the shared table by DEFAULT_FILE opened afresh
+
+            Usable as the initializer of a pool of worker processes, with
+            read_only=True, so that the workers read the file saved by the
+            writer process but never write it themselves.
+        """
+        cls._default = cls(cls.DEFAULT_FILE,read_only = read_only)
+        return cls._default
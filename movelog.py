@@ -0,0 +1,203 @@
+"""
+Compact binary logs of the moves made in a game of minesweeper, and fast
+replay of those logs. A MoveRecorder is attached to a game as a move
+protocol and records every (point, move_type) it is notified of. A MoveLog
+reads the recorded moves back and can rebuild the game as it was after any
+number of moves, through the batch path MinesweeperGame.apply_moves.
+
+Points are stored as cell ids, their index in the order of
+MinesweeperGame.board_iterator(). The log format is
+    the magic bytes b'MSML' and a version byte
+    the number of dimensions and the dimensions
+    the number of mines and the cell id of each mine, in increasing order,
+    each stored as the difference from the previous one
+    then for each move its cell id followed by a move type byte
+where all numbers but the move type bytes are varints (see util).
+
+functions
+    snapshot() - return a log that rebuilds the current state of a game
+
+classes
+    MoveRecorder - records the moves made in a game
+    MoveLog - replays recorded moves
+"""
+
+from game import MinesweeperGame
+from util import encode_varint, decode_varint
+
+import array
+import itertools
+
+MAGIC = b'MSML'
+VERSION = 1
+
+MOVE_TYPES = ['reveal','flag','unflag']
+MOVE_CODES = {move_type:code for code,move_type in enumerate(MOVE_TYPES)}
+
+def _points(dimensions):
+    # list of all points, indexed by cell id (see board_iterator)
+    return list(itertools.product(*[range(dim) for dim in dimensions]))
+
+class MoveRecorder():
+    """
+    Records the moves made in a game to a compact binary log.
+
+    The recorder registers itself as a move protocol of the game, so every
+    move, including the squares revealed automatically around empty
+    squares, is recorded.
+
+    Methods
+        log() -- return the moves recorded so far as a MoveLog
+        save() -- write the moves recorded so far to a file
+    """
+
+    def __init__(self,game,attach = True):
+        self.game = game
+        self.cell_ids = {point:index
+            for index,point in enumerate(_points(game.dimensions))}
+        self.events = bytearray()
+        self.num_events = 0
+        if attach:
+            self.game.add_move_protocol(self.move_protocol)
+
+    def move_protocol(self,point,move_type):
+        encode_varint(self.cell_ids[point],self.events)
+        self.events.append(MOVE_CODES[move_type])
+        self.num_events += 1
+
+    def to_bytes(self):
+        if not self.game.mines_placed:
+            raise ValueError('can not log a game before its mines are placed')
+
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        encode_varint(len(self.game.dimensions),out)
+        for dim in self.game.dimensions:
+            encode_varint(dim,out)
+
+        mines = sorted(self.cell_ids[mine] for mine in self.game.mines)
+        encode_varint(len(mines),out)
+        previous = 0
+        for mine in mines:
+            encode_varint(mine - previous,out)
+            previous = mine
+
+        out.extend(self.events)
+        return bytes(out)
+
+    def log(self):
+        return MoveLog(self.to_bytes())
+
+    def save(self,filename):
+        with open(filename,'wb') as file:
+            file.write(self.to_bytes())
+
+class MoveLog():
+    """
+    Moves recorded by a MoveRecorder, with random access.
+
+    len(log) is the number of moves, and log[i] is the i-th move as a pair
+    (point, move_type).
+
+    Methods
+        load() -- read a log from a file
+        moves() -- iterate over a range of moves
+        game_at() -- rebuild the game as it was before a given move
+    """
+
+    def __init__(self,data):
+        if data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError('not a move log')
+
+        pos = 5
+        num_dims,pos = decode_varint(data,pos)
+        dimensions = []
+        for _ in range(num_dims):
+            dim,pos = decode_varint(data,pos)
+            dimensions.append(dim)
+        self.dimensions = tuple(dimensions)
+
+        self.points = _points(self.dimensions)
+
+        num_mines,pos = decode_varint(data,pos)
+        mines = []
+        previous = 0
+        for _ in range(num_mines):
+            delta,pos = decode_varint(data,pos)
+            previous += delta
+            mines.append(self.points[previous])
+        self.mines = mines
+
+        # decode every move up front, so that moves can be accessed by index
+        cells = []
+        types = bytearray()
+        end = len(data)
+        while pos < end:
+            # inlined decode_varint, this loop is the bulk of loading a log
+            byte = data[pos]
+            pos += 1
+            cell = byte & 0x7f
+            shift = 7
+            while byte >= 0x80:
+                byte = data[pos]
+                pos += 1
+                cell |= (byte & 0x7f) << shift
+                shift += 7
+            cells.append(cell)
+            types.append(data[pos])
+            pos += 1
+        self.cells = array.array('L',cells)
+        self.types = bytes(types)
+
+    @classmethod
+    def load(cls,filename):
+        with open(filename,'rb') as file:
+            return cls(file.read())
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self,index):
+        return (self.points[self.cells[index]],MOVE_TYPES[self.types[index]])
+
+    def moves(self,start = 0,stop = None):
+        points = self.points
+        for cell,code in zip(self.cells[start:stop],self.types[start:stop]):
+            yield (points[cell],MOVE_TYPES[code])
+
+    def game_at(self,index = None):
+        """Return a new game in the state it was in before move index
+
+            The game is rebuilt with the recorded mines and the moves before
+            index are applied with MinesweeperGame.apply_moves. The returned
+            game has no move protocols, so solvers and displays can be
+            attached to it as usual. By default all moves are applied.
+        """
+        game = MinesweeperGame(dimensions = self.dimensions,mines = self.mines)
+
+        # The state of a square only depends on the last move made at it: a
+        # revealed square can not be flagged or unflagged afterwards. So
+        # only the last move at each square needs to be applied, and those
+        # are found by building a dict, which runs at C speed.
+        last_moves = dict(zip(self.cells[:index],self.types[:index]))
+
+        points = self.points
+        game.apply_moves((points[cell],MOVE_TYPES[code])
+            for cell,code in last_moves.items())
+        return game
+
+def snapshot(game):
+    """Return a compact snapshot of the current state of game
+
+        The snapshot is a log with one move for each revealed or flagged
+        square, so MoveLog(snapshot(game)).game_at() rebuilds the game.
+        The mines of game must have been placed.
+    """
+    recorder = MoveRecorder(game,attach = False)
+    for point in game.board_iterator():
+        if game.is_revealed(point):
+            recorder.move_protocol(point,'reveal')
+        elif game.is_flagged(point):
+            recorder.move_protocol(point,'flag')
+
+    return recorder.to_bytes()
@@ -0,0 +1,151 @@
+"""
+Lookup table of local minesweeper patterns. A pattern is the 5x5 window
+centered on a fringe point, encoded compactly enough that the same local
+situation (a 1-1 against a wall, a 1-2-1, ...) always yields the same key no
+matter where on the board it occurs. The table maps each key to the mines and
+free squares that can be deduced from the window alone, given as offsets from
+the center of the window.
+
+The table itself knows nothing about solving; see PatternSolver in the solve
+module, which fills the table by running ExhaustiveSolver on the miniature
+game returned by window_game().
+
+functions
+    window_key() - encode the window around a point on the board
+    window_game() - build a small MinesweeperGame equivalent to a key
+
+classes
+    PatternTable - size bounded, persistent mapping from window keys to deductions
+"""
+
+from game import MinesweeperGame
+from lrutable import LRUTable
+
+import os
+
+RADIUS = 2
+WIDTH = 2*RADIUS + 1
+
+# Codes used for the squares of a window. Codes 0-8 are only used for
+# revealed squares in the inner 3x3 of the window and give the number of
+# mines around that square that have not been flagged yet.
+UNKNOWN = 9
+INERT = 10  # flagged, off the board, or otherwise irrelevant to the window
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    'patterns.pickle')
+
+def _offsets(radius):
+    return [(dx,dy) for dy in range(-radius,radius + 1)
+        for dx in range(-radius,radius + 1)]
+
+WINDOW_OFFSETS = _offsets(RADIUS)
+INNER_OFFSETS = _offsets(RADIUS - 1)
+
+def window_key(game,point):
+    """Return the key of the window centered at point, or None
+
+        Only the revealed squares in the inner 3x3 of the window give
+        constraints, since all of their neighbors lie inside the window.
+        Unrevealed squares that are not adjacent to any such constraint are
+        encoded as INERT so that they do not split otherwise equal keys.
+
+        Args:
+            game (MinesweeperGame) -- a 2D game of minesweeper
+            point (tuple of ints) -- a revealed point on the board in game
+
+        Returns:
+            bytes of length 25, or None if point is not on the fringe
+    """
+    x,y = point
+    max_x,max_y = game.dimensions
+
+    # fetch the squares of the window once, None for points off the board
+    squares = []
+    for dx,dy in WINDOW_OFFSETS:
+        px,py = x + dx, y + dy
+        if 0 <= px < max_x and 0 <= py < max_y:
+            squares.append(game.grid[px][py])
+        else:
+            squares.append(None)
+
+    codes = [INERT]*(WIDTH*WIDTH)
+    for index,square in enumerate(squares):
+        if square and not square.is_revealed and not square.is_flagged:
+            codes[index] = UNKNOWN
+
+    constrained = [False]*(WIDTH*WIDTH)
+    for dx,dy in INNER_OFFSETS:
+        square = squares[_index(dx,dy)]
+        if not square or not square.is_revealed:
+            continue
+
+        neighbor_indices = [_index(dx + ex,dy + ey)
+            for ex,ey in INNER_OFFSETS if (ex,ey) != (0,0)]
+
+        if UNKNOWN not in [codes[index] for index in neighbor_indices]:
+            continue
+
+        num_flags = [squares[index].is_flagged for index in neighbor_indices
+            if squares[index]].count(True)
+
+        codes[_index(dx,dy)] = square.num_surrounding - num_flags
+        for index in neighbor_indices:
+            constrained[index] = True
+        constrained[_index(dx,dy)] = True
+
+    if codes[_index(0,0)] >= UNKNOWN:
+        return None
+
+    for index,code in enumerate(codes):
+        if code == UNKNOWN and not constrained[index]:
+            codes[index] = INERT
+
+    return bytes(codes)
+
+def window_game(key):
+    """Return a 5x5 MinesweeperGame equivalent to the window with given key
+
+        Constraint squares of the window are revealed, unknown squares are
+        left blank, and every other square is flagged. The number shown by a
+        revealed square counts its flagged neighbors as mines, so the blank
+        squares of the returned game are subject to exactly the constraints
+        encoded by the key.
+
+        Args:
+            key (bytes) -- a key returned by window_key()
+
+        Returns:
+            MinesweeperGame -- a game whose point (dx+2,dy+2) corresponds to
+                the point at offset (dx,dy) from the center of the window
+    """
+    game = MinesweeperGame(dimensions = (WIDTH,WIDTH), num_mines = 0)
+
+    for index,(dx,dy) in enumerate(WINDOW_OFFSETS):
+        if key[index] == INERT:
+            game._get_square((dx + RADIUS,dy + RADIUS)).is_flagged = True
+
+    for index,(dx,dy) in enumerate(WINDOW_OFFSETS):
+        if key[index] < UNKNOWN:
+            point = (dx + RADIUS,dy + RADIUS)
+            square = game._get_square(point)
+            square.is_revealed = True
+            square.num_surrounding = key[index] \
+                + len(list(game.flagged_neighbors(point)))
+
+    return game
+
+def _index(dx,dy):
+    return (dy + RADIUS)*WIDTH + (dx + RADIUS)
+
+class PatternTable(LRUTable):
+    """
+    Mapping from window keys to the deductions that follow from them.
+
+    Values are pairs (mines,free) of tuples of offsets from the center of
+    the window. Windows that allow no deduction are stored as a pair of
+    empty tuples so that they are not solved again. See LRUTable.
+    """
+
+    DEFAULT_FILE = DEFAULT_FILE
+    MAX_ENTRIES = 100000
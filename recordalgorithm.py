@@ -0,0 +1,51 @@
+from game import MinesweeperGame
+from display import MinesweeperGraphicDisplay
+from replay import ReplayRecorder
+from solve import HumanSolver,PatternSolver,ExhaustiveSolver,HybridSolver
+import argparse
+import os
+
+parser = argparse.ArgumentParser(
+    description="record solver runs without a display and save them as replays")
+parser.add_argument("-d","--display",
+                    choices=['classic', 'monokai'],
+                    default = 'monokai',
+                    help="display style (monokai is defualt)")
+parser.add_argument("-l","--level",
+                    choices=['easy','medium','hard'],
+                    default = 'medium')
+parser.add_argument("-m","--method",
+                    choices=['human','pattern','exhaustive','hybrid'],
+                    default = 'hybrid')
+parser.add_argument("-n","--num-games",
+                    type = int,
+                    default = 1)
+parser.add_argument("-o","--output",
+                    default = 'replays',
+                    help="directory to write the replays to")
+parser.add_argument("--png",
+                    action = 'store_true',
+                    help="also export each replay as a sequence of PNG images")
+parser.add_argument("--gif",
+                    action = 'store_true',
+                    help="also export each replay as an animated GIF (requires Pillow)")
+args = parser.parse_args()
+
+dimensions = {'easy':(9,9),'medium':(16,16),'hard':(30,16)}[args.level]
+solver = {'human':HumanSolver,'pattern':PatternSolver,'exhaustive':ExhaustiveSolver,'hybrid':HybridSolver}[args.method]
+
+os.makedirs(args.output,exist_ok = True)
+
+for number in range(args.num_games):
+    game = MinesweeperGame(dimensions = dimensions)
+    recorder = ReplayRecorder()
+    MinesweeperGraphicDisplay.show_algorithm(game,solver,
+        colorscheme=args.display,headless=True,recorder=recorder)
+
+    name = os.path.join(args.output,'game_%04d' % number)
+    replay = recorder.replay()
+    replay.save(name + '.msr')
+    if args.png:
+        replay.export_png(name)
+    if args.gif:
+        replay.export_gif(name + '.gif')
@@ -0,0 +1,212 @@
+"""
+Recording and export of the frames shown by a MinesweeperGraphicDisplay.
+A recorder only stores the squares that change from one frame to the next,
+as (cell index, sprite index) pairs, so a replay of a whole game is a few
+kilobytes. Replays can be exported to a sequence of PNG images or, if Pillow
+is installed, to an animated GIF.
+
+The replay file format is zlib compressed and consists of
+    the magic bytes b'MSRP' and a version byte
+    the width, height and colorscheme of the board
+    one byte per square giving the sprite shown at the start
+    the number of frames, then for each frame the number of changed squares
+    followed by a varint cell index and a sprite byte for each of them
+where all numbers but the sprite bytes are varints (see util).
+
+classes
+    ReplayRecorder - records the frames of a display
+    Replay - a recorded run, which can be exported to images
+"""
+
+from display import SPRITE_NAMES, SQUARE_WIDTH, load_sprite_atlas
+from util import encode_varint, decode_varint
+
+import os
+import pygame
+import zlib
+
+MAGIC = b'MSRP'
+VERSION = 1
+
+class ReplayRecorder():
+    """
+    Records the frames shown by a MinesweeperGraphicDisplay.
+
+    Pass a recorder to MinesweeperGraphicDisplay.record() (or to
+    show_algorithm) and call save() once the run is over. Cells are indexed
+    in the order of MinesweeperGame.board_iterator().
+
+    Methods
+        begin() -- start recording from the given board
+        record() -- note that a square now shows the given sprite
+        end_frame() -- store the squares changed since the last frame
+        save() -- write the replay to a file
+        replay() -- return the recorded run as a Replay
+    """
+
+    def __init__(self):
+        self.dimensions = None
+        self.colorscheme = None
+        self.initial = None
+        self.board = None
+        self.frames = []
+        self.pending = {}
+
+    def begin(self,dimensions,colorscheme,names):
+        self.dimensions = tuple(dimensions)
+        self.colorscheme = colorscheme
+        self.initial = bytes(SPRITE_NAMES.index(name) for name in names)
+        self.board = bytearray(self.initial)
+        self.frames = []
+        self.pending = {}
+
+    def record(self,point,name):
+        self.pending[point[0]*self.dimensions[1] + point[1]] = \
+            SPRITE_NAMES.index(name)
+
+    def end_frame(self):
+        changes = [(index,sprite) for index,sprite in self.pending.items()
+            if self.board[index] != sprite]
+        self.pending = {}
+
+        if changes:
+            for index,sprite in changes:
+                self.board[index] = sprite
+            self.frames.append(changes)
+
+    def replay(self):
+        self.end_frame()
+        return Replay(self.dimensions,self.colorscheme,self.initial,
+            self.frames)
+
+    def save(self,filename):
+        self.replay().save(filename)
+
+class Replay():
+    """
+    A recorded run of a MinesweeperGraphicDisplay.
+
+    Methods
+        load() -- read a replay from a file
+        save() -- write the replay to a file
+        boards() -- iterate over the sprite indices shown in each frame
+        surfaces() -- iterate over the images shown in each frame
+        export_png() -- write one PNG image per frame
+        export_gif() -- write an animated GIF (requires Pillow)
+    """
+
+    def __init__(self,dimensions,colorscheme,initial,frames):
+        self.dimensions = dimensions
+        self.colorscheme = colorscheme
+        self.initial = initial
+        self.frames = frames
+
+    def __len__(self):
+        # the initial board counts as a frame
+        return len(self.frames) + 1
+
+    @classmethod
+    def load(cls,filename):
+        with open(filename,'rb') as file:
+            data = zlib.decompress(file.read())
+
+        if data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError(filename + ' is not a replay file')
+
+        pos = 5
+        width,pos = decode_varint(data,pos)
+        height,pos = decode_varint(data,pos)
+        length,pos = decode_varint(data,pos)
+        colorscheme = data[pos:pos + length].decode('ascii')
+        pos += length
+
+        initial = data[pos:pos + width*height]
+        pos += width*height
+
+        num_frames,pos = decode_varint(data,pos)
+        frames = []
+        for _ in range(num_frames):
+            num_changes,pos = decode_varint(data,pos)
+            changes = []
+            for _ in range(num_changes):
+                index,pos = decode_varint(data,pos)
+                changes.append((index,data[pos]))
+                pos += 1
+            frames.append(changes)
+
+        return cls((width,height),colorscheme,initial,frames)
+
+    def save(self,filename):
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        encode_varint(self.dimensions[0],out)
+        encode_varint(self.dimensions[1],out)
+        encode_varint(len(self.colorscheme),out)
+        out.extend(self.colorscheme.encode('ascii'))
+        out.extend(self.initial)
+
+        encode_varint(len(self.frames),out)
+        for changes in self.frames:
+            encode_varint(len(changes),out)
+            for index,sprite in changes:
+                encode_varint(index,out)
+                out.append(sprite)
+
+        with open(filename,'wb') as file:
+            file.write(zlib.compress(bytes(out),9))
+
+    def boards(self):
+        board = bytearray(self.initial)
+        yield bytes(board)
+        for changes in self.frames:
+            for index,sprite in changes:
+                board[index] = sprite
+            yield bytes(board)
+
+    def surfaces(self,colorscheme = None):
+        """Iterate over the frames as pygame Surfaces
+
+            The same Surface is updated and yielded for every frame, only
+            the squares that changed are redrawn. Copy it to keep it.
+        """
+        if not pygame.get_init():
+            pygame.init()
+        (atlas,rects) = load_sprite_atlas(colorscheme or self.colorscheme)
+        areas = [rects[name] for name in SPRITE_NAMES]
+
+        height = self.dimensions[1]
+        surface = pygame.Surface((SQUARE_WIDTH*self.dimensions[0],
+            SQUARE_WIDTH*height))
+
+        def blit(index,sprite):
+            pos = ((index // height)*SQUARE_WIDTH,(index % height)*SQUARE_WIDTH)
+            surface.blit(atlas,pos,areas[sprite])
+
+        for index,sprite in enumerate(self.initial):
+            blit(index,sprite)
+        yield surface
+
+        for changes in self.frames:
+            for index,sprite in changes:
+                blit(index,sprite)
+            yield surface
+
+    def export_png(self,directory,colorscheme = None):
+        """Write frame_00000.png, frame_00001.png, ... to directory"""
+        os.makedirs(directory,exist_ok = True)
+        for number,surface in enumerate(self.surfaces(colorscheme)):
+            filename = os.path.join(directory,'frame_%05d.png' % number)
+            pygame.image.save(surface,filename)
+
+    def export_gif(self,filename,duration = 50,colorscheme = None):
+        """Write the replay as an animated GIF, duration ms per frame"""
+        try:
+            from PIL import Image
+        except ImportError:
+            raise ImportError('exporting a GIF requires Pillow')
+
+        images = [Image.frombytes('RGB',surface.get_size(),
+                pygame.image.tobytes(surface,'RGB'))
+            for surface in self.surfaces(colorscheme)]
+        images[0].save(filename,save_all = True,append_images = images[1:],
+            duration = duration,loop = 0)
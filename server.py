@@ -0,0 +1,370 @@
+"""
+An asyncio server hosting many games of minesweeper at once, for clients
+that want solver hints. Clients connect over TCP or a Unix socket and send
+one JSON object per line; the server answers each request with one JSON
+object per line, echoing the request's "id".
+
+Requests
+    {"op": "new", "dimensions": [30,16], "num_mines": 99}
+        -> {"session": <int>}
+    {"op": "reveal" | "flag" | "unflag", "session": <int>, "point": [x,y]}
+        -> {"moves": [[x,y,move_type,number or null], ...],
+            "over": <bool>, "won": <bool>}
+    {"op": "hint", "session": <int>}
+        -> {"mines": [[x,y], ...], "free": [[x,y], ...]}
+        or {"cancelled": true} if a move is made or the session is closed
+        before the hint is ready; the lists are empty if nothing is found
+        within the node budget of a hint
+    {"op": "close", "session": <int>}
+        -> {}
+Errors are answered with {"error": <message>}.
+
+Hints are computed by a HybridSolver in an executor (a process pool by
+default), from a snapshot of the game (see movelog.snapshot), so sessions
+hold no solver and the event loop never blocks on solve(). A solve that is
+already running can not be cancelled, so each hint searches at most
+hint_nodes nodes, and a session never has more than one solve in flight.
+Solver processes open the shared transposition table read only. Sessions that
+are idle for a while are evicted to their snapshot, and rebuilt when used
+again. loadtest.py is a matching client for measuring throughput.
+
+classes
+    MinesweeperServer - hosts the sessions and serves the protocol above
+"""
+
+from game import MinesweeperGame
+from movelog import MoveLog, snapshot
+from solve import HybridSolver
+from transposition import TranspositionTable
+from exceptions import *
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import time
+
+# nodes of exhaustive search a single hint may take
+HINT_NODES = 50000
+
+# the largest board a client may ask for
+MAX_SQUARES = 4000000
+
+def solve_snapshot(data,node_limit = None):
+    """Return the first (mines,free) found by a HybridSolver for a snapshot
+
+        Only the first deductions yielded by solve_iter are returned, since
+        getting a hint back quickly matters more than getting all of them.
+        If node_limit is given, the search stops after that many nodes and
+        empty lists are returned when nothing was found by then. Runs in
+        the executor, so it only takes and returns plain data.
+    """
+    game = MoveLog(data).game_at()
+    solver = HybridSolver(game)
+    solver.esolver.node_limit = node_limit
+    try:
+        (mines,free) = next(solver.solve_iter(),([],[]))
+    except SearchLimitException:
+        (mines,free) = ([],[])
+    return (sorted(set(mines)),sorted(set(free)))
+
+class Session():
+    """
+    One game hosted by the server.
+
+    The game is replaced by a snapshot when the session is evicted, and
+    rebuilt from it by get_game(). Moves are collected through a move
+    protocol so that they can be sent back to the client.
+    """
+
+    def __init__(self,dimensions,num_mines):
+        self.dimensions = dimensions
+        self.num_mines = num_mines
+        self.snapshot = None
+        self.hint_task = None
+        # the executor future of the last solve started for the session
+        self.solving = None
+        self.moves = []
+        self.last_used = time.monotonic()
+        self._set_game(MinesweeperGame(dimensions = dimensions,
+            num_mines = num_mines))
+
+    def _set_game(self,game):
+        self.game = game
+        self.game.add_move_protocol(self._move_protocol)
+
+    def _move_protocol(self,point,move_type):
+        self.moves.append((point,move_type))
+
+    def get_game(self):
+        self.last_used = time.monotonic()
+        if self.game is None:
+            if self.snapshot is None:
+                # evicted before the first move, nothing to restore
+                game = MinesweeperGame(dimensions = self.dimensions,
+                    num_mines = self.num_mines)
+            else:
+                game = MoveLog(self.snapshot).game_at()
+                self.snapshot = None
+            self._set_game(game)
+        return self.game
+
+    def evict(self):
+        if self.game.mines_placed:
+            self.snapshot = snapshot(self.game)
+        self.game = None
+
+    def cancel_hint(self):
+        if self.hint_task is not None:
+            self.hint_task.cancel()
+            self.hint_task = None
+
+def _is_int(value):
+    # JSON true and false decode to bools, which are ints to Python
+    return isinstance(value,int) and not isinstance(value,bool)
+
+def _process_pool(workers = None):
+    # solver processes read the transposition table, they never write it
+    return concurrent.futures.ProcessPoolExecutor(workers,
+        initializer = TranspositionTable.open_default,initargs = (True,))
+
+class MinesweeperServer():
+    """
+    Serves games of minesweeper with solver hints to many clients.
+
+    Methods
+        serve_tcp() -- serve on a TCP port until cancelled
+        serve_unix() -- serve on a Unix socket until cancelled
+        handle_request() -- answer one decoded request (for use in tests)
+    """
+
+    def __init__(self,executor = None,idle_timeout = 60,hint_nodes = HINT_NODES):
+        self.executor = executor or _process_pool()
+        self.idle_timeout = idle_timeout
+        self.hint_nodes = hint_nodes
+        self.sessions = {}
+        self.next_session = 0
+
+    async def serve_tcp(self,host = '127.0.0.1',port = 8765):
+        server = await asyncio.start_server(self._handle_connection,host,port)
+        await self._serve(server)
+
+    async def serve_unix(self,path):
+        server = await asyncio.start_unix_server(self._handle_connection,path)
+        await self._serve(server)
+
+    async def _serve(self,server):
+        evictor = asyncio.ensure_future(self._evict_idle_sessions())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            evictor.cancel()
+
+    async def _evict_idle_sessions(self):
+        while True:
+            await asyncio.sleep(self.idle_timeout/2)
+            now = time.monotonic()
+            for session in self.sessions.values():
+                if session.game is not None and session.hint_task is None \
+                        and now - session.last_used > self.idle_timeout:
+                    session.evict()
+
+    async def _handle_connection(self,reader,writer):
+        opened = []
+
+        def respond(request,response):
+            response['id'] = request.get('id')
+            writer.write(json.dumps(response).encode() + b'\n')
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    respond({},{'error':'invalid JSON'})
+                    continue
+
+                if request.get('op') == 'hint':
+                    # hints are answered whenever they are ready, so that
+                    # other requests are not held up
+                    self._start_hint(request,respond)
+                else:
+                    response = self.handle_request(request)
+                    if request.get('op') == 'new' and 'session' in response:
+                        opened.append(response['session'])
+                    respond(request,response)
+                await writer.drain()
+        finally:
+            # sessions die with the connection that opened them
+            for session_id in opened:
+                self._close(session_id)
+            writer.close()
+
+    def handle_request(self,request):
+        """Answer a request other than a hint, return the response dict"""
+        op = request.get('op')
+        try:
+            if op == 'new':
+                return self._new(request)
+
+            session = self.sessions.get(request.get('session'))
+            if session is None:
+                return {'error':'no such session'}
+
+            if op in ('reveal','flag','unflag'):
+                return self._move(session,op,tuple(request['point']))
+            elif op == 'close':
+                self._close(request['session'])
+                return {}
+            else:
+                return {'error':'unknown op ' + repr(op)}
+        except (KeyError,TypeError,ValueError,IndexError) as error:
+            return {'error':'bad request: ' + repr(error)}
+
+    def _new(self,request):
+        dimensions = tuple(request.get('dimensions',(16,16)))
+        if not dimensions or not all(_is_int(dim) and dim > 0
+                for dim in dimensions):
+            raise ValueError('dimensions must be positive integers')
+        num_squares = 1
+        for dim in dimensions:
+            num_squares *= dim
+        if num_squares > MAX_SQUARES:
+            raise ValueError('board larger than %d squares' % MAX_SQUARES)
+
+        # the first move and its neighbors are kept free of mines
+        num_mines = request.get('num_mines',-1)
+        if num_mines == -1:
+            num_mines = int(num_squares/5)
+        if not _is_int(num_mines) \
+                or not 0 <= num_mines <= num_squares - 3**len(dimensions):
+            raise ValueError('num_mines must leave room for the first move')
+
+        session_id = self.next_session
+        self.next_session += 1
+        self.sessions[session_id] = Session(dimensions,num_mines)
+        return {'session':session_id}
+
+    def _move(self,session,op,point):
+        # any pending hint is about to be stale
+        session.cancel_hint()
+
+        game = session.get_game()
+        if len(point) != len(game.dimensions) or not all(_is_int(coord)
+                and 0 <= coord < dim for coord,dim in zip(point,game.dimensions)):
+            raise ValueError('point off the board')
+
+        session.moves = []
+        won = False
+        try:
+            if op == 'reveal':
+                game.reveal(point)
+            elif op == 'flag':
+                game.place_flag(point)
+            else:
+                game.remove_flag(point)
+        except GameWonException:
+            won = True
+        except GameLostException:
+            pass
+        except GameOverException:
+            return {'error':'game over'}
+
+        moves = []
+        for point,move_type in session.moves:
+            number = game.num_mines_surrounding(point) \
+                if move_type == 'reveal' else None
+            moves.append(list(point) + [move_type,number])
+
+        return {'moves':moves,'over':game.is_over,'won':won}
+
+    def _close(self,session_id):
+        session = self.sessions.pop(session_id,None)
+        if session is not None:
+            session.cancel_hint()
+
+    def _start_hint(self,request,respond):
+        session = self.sessions.get(request.get('session'))
+        if session is None:
+            respond(request,{'error':'no such session'})
+            return
+
+        game = session.get_game()
+        if not game.mines_placed or game.is_over:
+            respond(request,{'mines':[],'free':[]})
+            return
+
+        session.cancel_hint()
+        data = snapshot(game)
+
+        async def hint():
+            try:
+                # a cancelled hint only drops its reply, the solve keeps
+                # its worker until done, so wait for it before starting
+                # another; a cancelled solve that is still queued is dropped
+                previous = session.solving
+                if previous is not None and not previous.done():
+                    await asyncio.wait([asyncio.wrap_future(previous)])
+
+                future = self.executor.submit(solve_snapshot,data,
+                    self.hint_nodes)
+                session.solving = future
+                (mines,free) = await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                respond(request,{'cancelled':True})
+                return
+            except Exception as error:
+                response = {'error':str(error) or type(error).__name__}
+            else:
+                response = {'mines':[list(p) for p in mines],
+                    'free':[list(p) for p in free]}
+
+            if session.hint_task is task:
+                session.hint_task = None
+            respond(request,response)
+
+        task = asyncio.ensure_future(hint())
+        session.hint_task = task
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="serve games of minesweeper with solver hints")
+    parser.add_argument("--host",
+                        default = '127.0.0.1')
+    parser.add_argument("-p","--port",
+                        type = int,
+                        default = 8765)
+    parser.add_argument("-u","--unix",
+                        help="serve on this Unix socket instead of TCP")
+    parser.add_argument("-w","--workers",
+                        type = int,
+                        default = None,
+                        help="number of solver processes (default: one per core)")
+    parser.add_argument("--threads",
+                        action = 'store_true',
+                        help="solve in threads instead of processes")
+    parser.add_argument("--idle-timeout",
+                        type = float,
+                        default = 60,
+                        help="seconds before an idle session is evicted")
+    parser.add_argument("--hint-nodes",
+                        type = int,
+                        default = HINT_NODES,
+                        help="nodes of search a hint may take")
+    args = parser.parse_args()
+
+    if args.threads:
+        executor = concurrent.futures.ThreadPoolExecutor(args.workers)
+    else:
+        executor = _process_pool(args.workers)
+
+    server = MinesweeperServer(executor,idle_timeout = args.idle_timeout,
+        hint_nodes = args.hint_nodes)
+    if args.unix:
+        asyncio.run(server.serve_unix(args.unix))
+    else:
+        asyncio.run(server.serve_tcp(args.host,args.port))
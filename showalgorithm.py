@@ -1,6 +1,6 @@
 from game import MinesweeperGame
-from display import MinesweeperGraphicDisplay
-from solve import HumanSolver,ExhaustiveSolver,HybridSolver
+from display import MinesweeperGraphicDisplay, MinesweeperAnsiConsoleDisplay
+from solve import HumanSolver,PatternSolver,ExhaustiveSolver,HybridSolver
 import argparse
 
 parser = argparse.ArgumentParser()
@@ -12,12 +12,26 @@ parser.add_argument("-l","--level",
                     choices=['easy','medium','hard'],
                     default = 'medium')
 parser.add_argument("-m","--method",
-                    choices=['human','exhaustive','hybrid'],
+                    choices=['human','pattern','exhaustive','hybrid'],
                     default = 'hybrid')
+parser.add_argument("--fps",
+                    type = int,
+                    default = 60,
+                    help="maximum number of screen updates per second")
+parser.add_argument("-s","--size",
+                    help="board size as WIDTHxHEIGHT, overrides the level")
+parser.add_argument("-c","--console",
+                    action = 'store_true',
+                    help="show the game in the terminal instead of a window")
 args = parser.parse_args()
 
 dimensions = {'easy':(9,9),'medium':(16,16),'hard':(30,16)}[args.level]
-solver = {'human':HumanSolver,'exhaustive':ExhaustiveSolver,'hybrid':HybridSolver}[args.method]
+if args.size:
+    dimensions = tuple(map(int,args.size.split('x')))
+solver = {'human':HumanSolver,'pattern':PatternSolver,'exhaustive':ExhaustiveSolver,'hybrid':HybridSolver}[args.method]
 
 game = MinesweeperGame(dimensions = dimensions)
-MinesweeperGraphicDisplay.show_algorithm(game,solver,colorscheme=args.display)
\ No newline at end of file
+if args.console:
+    MinesweeperAnsiConsoleDisplay.show_algorithm(game,solver)
+else:
+    MinesweeperGraphicDisplay.show_algorithm(game,solver,colorscheme=args.display,fps=args.fps)
\ No newline at end of file
@@ -11,8 +11,27 @@ derives their space and time complexity.
 
 from exceptions import *
 from util import powerset
+from patterns import PatternTable, window_key, window_game
+from transposition import TranspositionTable, canonicalize
+from costmodel import CostModel, component_features
 
+import collections
 import itertools
+import math
+import time
+
+# Bonus given by GuessSolver for the squares a guess is expected to prove free,
+# as a fraction of its survival probability, and the number of squares that
+# earns the whole bonus
+LOOKAHEAD_WEIGHT = 0.05
+LOOKAHEAD_HORIZON = 8
+
+# Estimated search costs, in calls to ExhaustiveSolver._sphelper, up to which
+# HybridSolver enumerates a component fully or tries a bounded search, and
+# the number of calls a bounded search may make
+ENUMERATE_LIMIT = 5000
+SEARCH_LIMIT = 200000
+SEARCH_NODES = 10000
 
 
 def is_fringe_point(game,point):
@@ -65,6 +84,7 @@ class BruteSolver():
 
     Methods
         solve() -- returns points that are known to be free or mined
+        solve_iter() -- yields points known to be free or mined as they are found
     """
 
     def __init__(self,game):
@@ -110,6 +130,31 @@ class BruteSolver():
 
         return (known_mines,known_free)
 
+    def solve_iter(self):
+        """Yields pairs (mines,free) of known mines and free squares
+
+            Unlike solve(), which returns everything it can determine at
+            once, solve_iter yields deductions as soon as they are proven,
+            so the client can apply them right away or stop early. The
+            client may make moves between iterations; the deductions still
+            to come remain valid. A pass ends when nothing more can be
+            determined from the state of the game when the pass started
+            (or, for some solvers, from the moves made since), so call
+            solve_iter again once the iteration is over, just as solve()
+            is called repeatedly.
+
+            BruteSolver searches the whole perimiter at once, so it yields
+            at most one pair, the result of solve().
+
+            Yields:
+                (mines,free)
+                    mines -- a set of points determined to contain mines
+                    free -- a set of points determined to be free.
+        """
+        (mines,free) = self.solve()
+        if mines or free:
+            yield (mines,free)
+
     def _satisfactory_placement_generator(self):
         # generates all satisfactory mine placements 
 
@@ -160,15 +205,161 @@ class ExhaustiveSolver(BruteSolver):
     repeatedly to solve the game with which the solver is initialize. See the
     documentation for solve for more details.
 
+    The fringe is split into components that share no unknown points, and
+    each component is solved on its own. Results are stored in a
+    TranspositionTable under a key that is the same for every translation,
+    rotation and reflection of the component, so that a component seen
+    before is not searched again. By default the table returned by
+    TranspositionTable.default() is used.
+
     Methods
         solve() -- returns points that are known to be free or mined
+        solve_iter() -- yields points known to be free or mined as they are found
     """
 
+    def __init__(self,game,table = None):
+        super().__init__(game)
+        self.table = table if table is not None else TranspositionTable.default()
+
+        # probability that each point in the perimiter contains a mine, as
+        # of the last call to solve(), counting each satisfactory placement
+        # of a component as equally likely
+        self.probabilities = {}
+
+        # calls to _sphelper so far, and the count at which _sphelper raises
+        # SearchLimitException (None for no limit); it also raises it once
+        # time.perf_counter() passes deadline, checked every 64 nodes
+        self.nodes = 0
+        self.node_limit = None
+        self.deadline = None
+
+    def solve(self):
+        known_mines = set([])
+        known_free = set([])
+        self.probabilities = {}
+
+        for fringe_list in self._components():
+            (mines,free,probabilities) = self._solve_component(fringe_list)
+            known_mines.update(mines)
+            known_free.update(free)
+            self.probabilities.update(probabilities)
+
+        return (known_mines,known_free)
+
+    def solve_iter(self):
+        # Yield the deductions of each component as soon as it is solved,
+        # smallest components first since they are the quickest to settle.
+        # Components are taken from the fringe as it was at the start;
+        # moves made in between can only remove unknown points from them.
+        self.probabilities = {}
+
+        for fringe_list in sorted(self._components(),key=len):
+            fringe_list = [point for point in fringe_list
+                if point in self.fringe]
+            if not fringe_list:
+                continue
+
+            (mines,free,probabilities) = self._solve_component(fringe_list)
+            self.probabilities.update(probabilities)
+            if mines or free:
+                yield (mines,free)
+
+    def _components(self):
+        # Split the fringe into lists of points connected by shared blank
+        # neighbors. Components are independent: a placement of mines is
+        # satisfactory iff its restriction to each component is.
+        in_play_to_fringe = {}
+        for point in self.fringe:
+            for inp in self.game.blank_neighbors(point):
+                in_play_to_fringe.setdefault(inp,[]).append(point)
+
+        components = []
+        unvisited = set(self.fringe)
+        while unvisited:
+            start = unvisited.pop()
+            component = [start]
+            stack = [start]
+            while stack:
+                point = stack.pop()
+                for inp in self.game.blank_neighbors(point):
+                    for point2 in in_play_to_fringe[inp]:
+                        if point2 in unvisited:
+                            unvisited.remove(point2)
+                            component.append(point2)
+                            stack.append(point2)
+            components.append(sorted(component))
+
+        return components
+
+    def _component(self,fringe_list):
+        # Return the constraints and perimiter of the component with the
+        # given fringe points, its canonical key and the map from canonical
+        # to board points
+        constraints = {}
+        perimiter = set([])
+        for point in fringe_list:
+            flags = len(list(self.game.flagged_neighbors(point)))
+            constraints[point] = self.game.num_mines_surrounding(point) - flags
+            perimiter.update(self.game.blank_neighbors(point))
+
+        (key,to_point) = canonicalize(constraints,perimiter)
+        return (constraints,perimiter,key,to_point)
+
+    def _solve_component(self,fringe_list,component = None):
+        # Return (mines,free,probabilities) for the component with the
+        # given fringe points, using the transposition table if possible
+        (constraints,perimiter,key,to_point) = \
+            component or self._component(fringe_list)
+
+        result = self.table.get(key)
+        if result is None:
+            to_canonical = {point:cpoint for cpoint,point in to_point.items()}
+            (mines,free,probabilities) = self._enumerate_component(fringe_list,
+                perimiter)
+            result = (tuple(to_canonical[point] for point in mines),
+                tuple(to_canonical[point] for point in free),
+                tuple((to_canonical[point],prob)
+                    for point,prob in probabilities.items()))
+            self.table.add(key,result)
+
+        (mines,free,probabilities) = result
+        return (set(to_point[cpoint] for cpoint in mines),
+            set(to_point[cpoint] for cpoint in free),
+            {to_point[cpoint]:prob for cpoint,prob in probabilities})
+
+    def _enumerate_component(self,fringe_list,perimiter):
+        # Count, for each point in perimiter, the satisfactory placements
+        # of the component in which the point has a mine
+        mine_counts = dict.fromkeys(perimiter,0)
+        num_placements = 0
+        for mine_placement in self._sphelper(fringe_list,0,set([]),set([])):
+            num_placements += 1
+            for mine in mine_placement:
+                mine_counts[mine] += 1
+
+        if num_placements == 0:
+            # the flags placed so far are inconsistent with the board
+            return (set([]),set([]),{})
+
+        mines = set(point for point,count in mine_counts.items()
+            if count == num_placements)
+        free = set(point for point,count in mine_counts.items() if count == 0)
+        probabilities = {point:count/num_placements
+            for point,count in mine_counts.items()}
+        return (mines,free,probabilities)
+
     def _satisfactory_placement_generator(self):
         yield from self._sphelper(list(self.fringe),0,set([]),set([]))
 
     def _sphelper(self,fringe_list,fringe_index,proposed_mines,
         proposed_free):
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchLimitException()
+        if self.deadline is not None and self.nodes % 64 == 0 \
+                and time.perf_counter() > self.deadline:
+            raise SearchLimitException()
+
         if fringe_index == len(fringe_list):
             # At this point proposed_mines is a satisfactory placement of mines about
             # the fringe thus, we can narrow down known_mines to include only
@@ -222,6 +413,7 @@ class HumanSolver():
 
     Methods
         solve() -- returns points that are known to be free or mined
+        solve_iter() -- yields points known to be free or mined as they are found
     """
 
     def __init__(self,game):
@@ -294,6 +486,16 @@ class HumanSolver():
 
         return (new_mines,new_free)
 
+    def solve_iter(self):
+        # Each call to solve() checks active fringe points until one gives
+        # a deduction. Points activated by moves the client makes between
+        # iterations are checked in the same pass.
+        while(True):
+            (mines,free) = self.solve()
+            if not mines and not free:
+                return
+            yield (mines,free)
+
     def _update_solver_with_move(self,point,move_type):
         if move_type == 'reveal' or move_type == 'flag':
 
@@ -315,6 +517,504 @@ class HumanSolver():
                 self.active_fringe.extend(self.game.revealed_neighbors(point))
 
 
+class ConstraintSolver():
+    """
+    Solves a game of minesweeper.
+
+    Solvers are initialized by passing a game to be solved as a parameter.
+    The sole use of a solver is the solve() function which is called 
+    repeatedly to solve the game with which the solver is initialize. See the
+    documentation for solve for more details.
+
+    Each fringe point gives a constraint: the set of its blank neighbors
+    holds as many mines as its number less its flagged neighbors. The
+    constraints are kept in a store, with an index from each point to the
+    constraints that contain it. Whenever the points of one constraint are
+    a subset of the points of another, their difference holds the
+    difference of their mines, which is added as a new constraint, and so
+    on until nothing new is found. Constraints with no mines, or with as
+    many mines as points, give the known free and mined points. A move only
+    rewrites the constraints that contain the point moved, and only new or
+    rewritten constraints are compared with the others again.
+
+    Methods
+        solve() -- returns points that are known to be free or mined
+        solve_iter() -- yields points known to be free or mined as they are found
+    """
+
+    def __init__(self,game):
+        self.game = game
+
+        # maps the frozenset of points of each constraint to its number of
+        # mines, so that a constraint is only stored once
+        self.constraints = {}
+
+        # maps each point to the set of constraints that contain it
+        self.index = {}
+
+        # constraints that are new or changed since they were last compared
+        # with the others
+        self.dirty = collections.deque()
+
+        self._rebuild()
+        self.game.add_move_protocol(self._update_solver_with_move)
+
+    def solve(self):
+        mines = set([])
+        free = set([])
+        while(self.dirty and not (mines or free)):
+            points = self.dirty.popleft()
+            num_mines = self.constraints.get(points)
+            if num_mines is None:
+                # rewritten or removed since it was queued
+                continue
+
+            if num_mines == 0 or num_mines == len(points):
+                (free if num_mines == 0 else mines).update(points)
+                self._remove(points)
+                continue
+
+            others = set([])
+            for point in points:
+                others.update(self.index[point])
+            others.remove(points)
+
+            for other in others:
+                num_mines2 = self.constraints[other]
+                if len(other) > len(points):
+                    if points < other:
+                        self._add(other - points,num_mines2 - num_mines)
+                elif other < points:
+                    self._add(points - other,num_mines - num_mines2)
+
+        return (mines,free)
+
+    def solve_iter(self):
+        while(True):
+            (mines,free) = self.solve()
+            if not mines and not free:
+                return
+            yield (mines,free)
+
+    def _add(self,points,num_mines):
+        if not points or points in self.constraints:
+            return
+        if num_mines < 0 or num_mines > len(points):
+            # only possible if a flag is wrong
+            return
+
+        self.constraints[points] = num_mines
+        for point in points:
+            self.index.setdefault(point,set([])).add(points)
+        self.dirty.append(points)
+
+    def _remove(self,points):
+        del self.constraints[points]
+        for point in points:
+            self.index[point].discard(points)
+            if not self.index[point]:
+                del self.index[point]
+
+    def _add_fringe_point(self,point):
+        points = frozenset(self.game.blank_neighbors(point))
+        flags = len(list(self.game.flagged_neighbors(point)))
+        self._add(points,self.game.num_mines_surrounding(point) - flags)
+
+    def _rebuild(self):
+        self.constraints = {}
+        self.index = {}
+        self.dirty = collections.deque()
+        for point in self.game.board_iterator():
+            if is_fringe_point(self.game,point):
+                self._add_fringe_point(point)
+
+    def _update_solver_with_move(self,point,move_type):
+        if move_type == 'unflag':
+            # the point is unknown again, in constraints it had been taken
+            # out of, so start over
+            self._rebuild()
+            return
+
+        # the point is now known, take it out of every constraint
+        is_mine = 1 if move_type == 'flag' else 0
+        for points in list(self.index.get(point,())):
+            num_mines = self.constraints[points]
+            self._remove(points)
+            self._add(points - set([point]),num_mines - is_mine)
+
+        if move_type == 'reveal':
+            self._add_fringe_point(point)
+
+class PatternSolver(HumanSolver):
+    """
+    Solves a game of minesweeper.
+
+    Solvers are initialized by passing a game to be solved as a parameter.
+    The sole use of a solver is the solve() function which is called 
+    repeatedly to solve the game with which the solver is initialize. See the
+    documentation for solve for more details.
+
+    Deductions are looked up in a PatternTable keyed by the window around
+    each active fringe point (see the patterns module). Windows missing from
+    the table are solved once with ExhaustiveSolver and added to it. By
+    default all PatternSolvers share the table returned by
+    PatternTable.default(). Only 2D games are supported, for other games
+    solve() never finds anything.
+
+    Methods
+        solve() -- returns points that are known to be free or mined
+        solve_iter() -- yields points known to be free or mined as they are found
+    """
+
+    def __init__(self,game,table = None):
+        super().__init__(game)
+        self.table = table if table is not None else PatternTable.default()
+
+    def solve(self):
+        if len(self.game.dimensions) != 2:
+            self.active_fringe.clear()
+            return ([],[])
+
+        while(self.active_fringe):
+            point = self.active_fringe.pop()
+
+            key = window_key(self.game,point)
+            if key is None:
+                continue
+
+            deductions = self.table.get(key)
+            if deductions is None:
+                deductions = self._solve_window(key)
+
+            mine_offsets,free_offsets = deductions
+            if not mine_offsets and not free_offsets:
+                continue
+
+            x,y = point
+            mines = set((x + dx,y + dy) for dx,dy in mine_offsets)
+            free = set((x + dx,y + dy) for dx,dy in free_offsets)
+            return (mines,free)
+
+        return ([],[])
+
+    def _solve_window(self,key):
+        mines,free = ExhaustiveSolver(window_game(key)).solve()
+
+        to_offset = lambda p: (p[0] - 2,p[1] - 2)
+        deductions = (tuple(map(to_offset,mines)),tuple(map(to_offset,free)))
+        self.table.add(key,deductions)
+        return deductions
+
+class GuessSolver():
+    """
+    Chooses a square to reveal when no square is known to be free.
+
+    Candidates are ranked by the probability that they are free, combined
+    with how much revealing them is expected to tell. For each candidate the
+    distribution of the number it could show is computed from the
+    satisfactory placements of its component of the fringe (see
+    ExhaustiveSolver), along with the number of squares that each number
+    would prove free. That expected number of squares, capped at
+    LOOKAHEAD_HORIZON, adds a bonus of at most LOOKAHEAD_WEIGHT times the
+    survival probability. A candidate that can not beat the safest square
+    even with the whole bonus is dominated, and is pruned before any
+    lookahead is done.
+
+    Placements are weighted by the number of ways to place the remaining
+    mines in the squares that no fringe point touches, so probabilities
+    account for the number of mines left. Enumeration is limited to
+    max_nodes search nodes (calls to ExhaustiveSolver._sphelper) and
+    max_time seconds per guess, both enforced within the search: a
+    component over the budget gets the same flat probability as the
+    untouched squares, and candidates still waiting when time runs out are
+    ranked by survival alone. Placements are cached by canonical component
+    (see transposition.canonicalize), so they are shared between candidates
+    and reused by later guesses; the cache holds at most cache_size
+    placements in all.
+
+    Methods
+        guess() -- returns the point to reveal next
+    """
+
+    def __init__(self,game,esolver = None,max_nodes = 20000,max_time = 0.1,
+        cache_size = 50000):
+        self.game = game
+        self.esolver = esolver if esolver is not None else ExhaustiveSolver(game)
+        self.max_nodes = max_nodes
+        self.max_time = max_time
+        self.cache_size = cache_size
+
+        # maps canonical component keys to the satisfactory placements of
+        # the component in canonical coordinates, or to None if finding
+        # them takes more than max_nodes nodes, least recently used first
+        self.cache = collections.OrderedDict()
+        self.cached_placements = 0
+
+        # survival probability and score of each candidate considered by
+        # the last call to guess()
+        self.survival = {}
+        self.scores = {}
+
+    def guess(self):
+        """Returns the point to reveal next
+
+            Returns None if there are no unknown squares left. Flags are
+            assumed to be correct.
+        """
+        game = self.game
+        self.deadline = time.perf_counter() + self.max_time
+        self.nodes = 0
+
+        blank = set([])
+        num_flags = 0
+        for point in game.board_iterator():
+            if game.is_flagged(point):
+                num_flags += 1
+            elif not game.is_revealed(point):
+                blank.add(point)
+        if not blank:
+            return None
+
+        components = []
+        for fringe_list in self.esolver._components():
+            (perimiter,placements) = self._placements(fringe_list)
+            if placements:
+                components.append((perimiter,placements))
+
+        # squares in no enumerated component share one flat probability
+        untouched = set(blank)
+        for (perimiter,placements) in components:
+            untouched.difference_update(perimiter)
+
+        (weights,density) = self._weights(components,len(untouched),
+            game.num_mines - num_flags)
+
+        probabilities = dict.fromkeys(untouched,density)
+        for (perimiter,placements),weight in zip(components,weights):
+            for point in perimiter:
+                probabilities[point] = 0.0
+            for placement,w in zip(placements,weight):
+                for point in placement:
+                    probabilities[point] += w
+
+        # all untouched squares are alike but for their number of unknown
+        # neighbors, so only those with the fewest are candidates
+        candidates = [point for point in probabilities if point not in untouched]
+        if untouched:
+            fewest = sorted(untouched,key=lambda p: (self._num_blank(p),p))
+            candidates.extend(fewest[:4])
+
+        self.survival = {point:1 - probabilities[point] for point in candidates}
+        best = max(self.survival.values())
+        candidates = [point for point in candidates
+            if self.survival[point]*(1 + LOOKAHEAD_WEIGHT) >= best]
+        candidates.sort(key=lambda p: (-self.survival[p],p))
+
+        component_of = {}
+        for index,(perimiter,placements) in enumerate(components):
+            for point in perimiter:
+                component_of[point] = index
+
+        self.scores = {}
+        for point in candidates:
+            survival = self.survival[point]
+            if time.perf_counter() > self.deadline or survival == 0:
+                # no time left for lookahead, survival is a lower bound
+                self.scores[point] = survival
+                continue
+
+            if point in component_of:
+                index = component_of[point]
+                progress = self._component_progress(point,components[index],
+                    weights[index],probabilities)
+            else:
+                progress = self._untouched_progress(point,probabilities)
+
+            bonus = min(progress,LOOKAHEAD_HORIZON)/LOOKAHEAD_HORIZON
+            self.scores[point] = survival*(1 + LOOKAHEAD_WEIGHT*bonus)
+
+        return max(candidates,key=lambda p: (self.scores[p],self.survival[p]))
+
+    def _num_blank(self,point):
+        return len(list(self.game.blank_neighbors(point)))
+
+    def _placements(self,fringe_list):
+        # Return the perimiter of the component and its satisfactory
+        # placements as frozensets of points, or None if over the budget
+        (constraints,perimiter,key,to_point) = \
+            self.esolver._component(fringe_list)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            placements = self.cache[key]
+            if placements is None:
+                return (perimiter,None)
+            return (perimiter,[frozenset(to_point[cpoint] for cpoint in placement)
+                for placement in placements])
+
+        # the search stops once it has used up what is left of the node
+        # budget of this guess, or at the deadline, within any limit the
+        # caller has set on esolver
+        esolver = self.esolver
+        (node_limit,deadline) = (esolver.node_limit,esolver.deadline)
+        remaining = self.max_nodes - self.nodes
+        start = esolver.nodes
+        esolver.node_limit = start + remaining if node_limit is None \
+            else min(start + remaining,node_limit)
+        esolver.deadline = self.deadline if deadline is None \
+            else min(self.deadline,deadline)
+
+        placements = []
+        try:
+            for placement in esolver._sphelper(fringe_list,0,set([]),set([])):
+                placements.append(frozenset(placement))
+        except SearchLimitException:
+            if remaining == self.max_nodes and esolver.nodes > start + remaining:
+                # over the whole budget, the same would happen next time
+                self._cache(key,None)
+            return (perimiter,None)
+        finally:
+            self.nodes += esolver.nodes - start
+            (esolver.node_limit,esolver.deadline) = (node_limit,deadline)
+
+        to_canonical = {point:cpoint for cpoint,point in to_point.items()}
+        self._cache(key,[frozenset(to_canonical[point] for point in placement)
+            for placement in placements])
+        return (perimiter,placements)
+
+    def _cache(self,key,placements):
+        # the size of the cache is the number of placements it holds, an
+        # entry of None counting as one
+        size = lambda placements: len(placements) if placements else 1
+        if key in self.cache:
+            self.cached_placements -= size(self.cache.pop(key))
+        self.cache[key] = placements
+        self.cached_placements += size(placements)
+        while self.cached_placements > self.cache_size:
+            (_,evicted) = self.cache.popitem(last=False)
+            self.cached_placements -= size(evicted)
+
+    def _weights(self,components,num_untouched,mines_left):
+        # Return the probability of each placement of each component and
+        # the probability that an untouched square has a mine. A placement
+        # is weighted by the number of ways to complete it with placements
+        # of the other components and mines in the untouched squares.
+        counts = []
+        for (perimiter,placements) in components:
+            count = [0]*(max(map(len,placements)) + 1)
+            for placement in placements:
+                count[len(placement)] += 1
+            counts.append(count)
+
+        def convolve(a,b):
+            out = [0]*(len(a) + len(b) - 1)
+            for i,x in enumerate(a):
+                if x:
+                    for j,y in enumerate(b):
+                        out[i + j] += x*y
+            return out
+
+        def rest(k):
+            # ways to place the remaining mines in the untouched squares
+            if 0 <= mines_left - k <= num_untouched:
+                return math.comb(num_untouched,mines_left - k)
+            return 0
+
+        total = [1]
+        for count in counts:
+            total = convolve(total,count)
+        normalizer = sum(t*rest(k) for k,t in enumerate(total))
+        if normalizer == 0:
+            # the number of mines left is inconsistent with the board, so
+            # ignore it
+            rest = lambda k: 1
+            normalizer = sum(total)
+
+        weights = []
+        for index,(perimiter,placements) in enumerate(components):
+            others = [1]
+            for other,count in enumerate(counts):
+                if other != index:
+                    others = convolve(others,count)
+            by_size = [sum(o*rest(k + r) for r,o in enumerate(others))/normalizer
+                for k in range(len(counts[index]))]
+            weights.append([by_size[len(placement)] for placement in placements])
+
+        if num_untouched == 0:
+            density = 0.0
+        else:
+            expected = sum(t*rest(k)*(mines_left - k)
+                for k,t in enumerate(total))/normalizer
+            density = min(1.0,max(0.0,expected/num_untouched))
+        return (weights,density)
+
+    def _untouched_progress(self,point,probabilities):
+        # expected number of squares proven free by revealing point, given
+        # that it is free: only a 0 proves anything about its neighbors
+        neighbors = list(self.game.blank_neighbors(point))
+        zero = 1.0
+        for neighbor in neighbors:
+            zero *= 1 - probabilities[neighbor]
+        return zero*len(neighbors)
+
+    def _component_progress(self,point,component,weight,probabilities):
+        # Expected number of squares proven free by revealing point, given
+        # that it is free. The number shown is the mines among its neighbors
+        # in the component, known for each placement, plus the mines among
+        # its other neighbors, taken to be independent.
+        (perimiter,placements) = component
+        inside = set(neighbor for neighbor in self.game.blank_neighbors(point)
+            if neighbor in perimiter)
+        outside = [neighbor for neighbor in self.game.blank_neighbors(point)
+            if neighbor not in perimiter]
+
+        # distribution of the number of mines outside
+        outside_counts = [1.0]
+        for neighbor in outside:
+            p = probabilities[neighbor]
+            outside_counts = [a*(1 - p) + b*p
+                for a,b in zip(outside_counts + [0.0],[0.0] + outside_counts)]
+
+        # group the placements in which point is free by the number of mines
+        # they put around it, noting which squares have a mine in all or
+        # in none of the placements of each group
+        groups = {}
+        safe_weight = 0.0
+        for placement,w in zip(placements,weight):
+            if point in placement:
+                continue
+            safe_weight += w
+            around = len(placement & inside)
+            if around in groups:
+                group = groups[around]
+                group[0] += w
+                group[1] |= placement
+            else:
+                groups[around] = [w,set(placement)]
+        if safe_weight == 0:
+            return 0.0
+
+        others = perimiter - set([point])
+        progress = 0.0
+        for number in range(len(inside) + len(outside) + 1):
+            possible = [(around,group) for around,group in groups.items()
+                if 0 <= number - around < len(outside_counts)
+                and outside_counts[number - around] > 0]
+            if not possible:
+                continue
+
+            chance = sum(group[0]*outside_counts[number - around]
+                for around,group in possible)/safe_weight
+            mined_somewhere = set([])
+            for around,group in possible:
+                mined_somewhere |= group[1]
+            unlocked = len(others - mined_somewhere)
+            if all(number == around for around,group in possible):
+                # no mines outside, so those neighbors are free too
+                unlocked += len(outside)
+            progress += chance*unlocked
+
+        return progress
+
 class HybridSolver():
     """
     Solves a game of minesweeper.
@@ -326,12 +1026,38 @@ class HybridSolver():
 
     Methods
         solve() -- returns points that are known to be free or mined
+        solve_iter() -- yields points known to be free or mined as they are found
+        guess() -- returns the point to reveal when nothing more can be solved
+
+    The human and constraint tiers are always tried first, preceded by the
+    pattern tier if patterns is True. Keying the windows costs more than
+    the human tier saves, so the pattern tier is off unless the pattern
+    table itself is wanted (see buildpatterns.py). The components of the
+    fringe left to them are dispatched by their estimated search cost
+    (see costmodel): a component whose result is in the transposition
+    table, or whose cost is at most enumerate_limit nodes, is enumerated by
+    ExhaustiveSolver; one that costs at most search_limit nodes gets a
+    bounded search that proves what it can within search_nodes nodes; any
+    other component is left to guess(). The cost of every enumeration is
+    recorded in the cost model, so that it can be refitted.
     """
 
 
-    def __init__(self,game):
-        self.esolver = ExhaustiveSolver(game)
+    def __init__(self,game,table = None,cost_model = None,
+        enumerate_limit = ENUMERATE_LIMIT,search_limit = SEARCH_LIMIT,
+        search_nodes = SEARCH_NODES,patterns = False):
+        self.game = game
+        self.esolver = ExhaustiveSolver(game,table = table)
         self.hsolver = HumanSolver(game)
+        self.psolver = PatternSolver(game) if patterns else None
+        self.csolver = ConstraintSolver(game)
+        self.guesser = GuessSolver(game,esolver = self.esolver)
+
+        self.cost_model = cost_model if cost_model is not None \
+            else CostModel.default()
+        self.enumerate_limit = enumerate_limit
+        self.search_limit = search_limit
+        self.search_nodes = search_nodes
 
     def solve(self):
         """Returns a set of known mines and a set of known free squares
@@ -352,13 +1078,123 @@ class HybridSolver():
                     free -- a set of points determined to be free.
         """
 
-        mines,free = self.hsolver.solve()
+        mines,free = self.psolver.solve() if self.psolver else ([],[])
+
+        if not mines and not free:
+            mines,free = self.hsolver.solve()
+
+        if not mines and not free:
+            mines,free = self.csolver.solve()
 
         if not mines and not free:
-            mines,free = self.esolver.solve()
+            mines = set([])
+            free = set([])
+            for (component_mines,component_free) in self._solve_components():
+                mines.update(component_mines)
+                free.update(component_free)
 
         return mines,free
 
+    def solve_iter(self):
+        # The cheap tiers are repeated for as long as the client applies
+        # what they find, the exhaustive tier only runs once they are dry
+        found = True
+        while(found):
+            found = False
+            if self.psolver:
+                for deductions in self.psolver.solve_iter():
+                    found = True
+                    yield deductions
+            for deductions in self.hsolver.solve_iter():
+                found = True
+                yield deductions
+            for deductions in self.csolver.solve_iter():
+                found = True
+                yield deductions
+
+        yield from self._solve_components()
+
+    def guess(self):
+        """Returns the point to reveal when nothing more can be solved
+
+            See GuessSolver for how the point is chosen.
+        """
+        return self.guesser.guess()
+
+    def _solve_components(self):
+        # Yield the deductions for each component of the fringe, searched
+        # as its estimated cost allows, smallest components first
+        esolver = self.esolver
+        esolver.probabilities = {}
+
+        for fringe_list in sorted(esolver._components(),key=len):
+            fringe_list = [point for point in fringe_list
+                if point in esolver.fringe]
+            if not fringe_list:
+                continue
+
+            component = esolver._component(fringe_list)
+            (constraints,perimiter,key,to_point) = component
+            features = component_features(self.game,constraints,perimiter)
+            cost = self.cost_model.estimate(features)
+
+            if cost <= self.enumerate_limit or esolver.table.get(key) is not None:
+                nodes = esolver.nodes
+                (mines,free,probabilities) = esolver._solve_component(
+                    fringe_list,component)
+                if esolver.nodes > nodes:
+                    self.cost_model.record(features,esolver.nodes - nodes)
+                esolver.probabilities.update(probabilities)
+            elif cost <= self.search_limit:
+                (mines,free) = self._bounded_search(fringe_list,perimiter)
+            else:
+                # too expensive to search, leave it to guess()
+                continue
+
+            if mines or free:
+                yield (mines,free)
+
+    def _bounded_search(self,fringe_list,perimiter):
+        # Return the points of the component that can be proven mined or
+        # free within search_nodes nodes. A point is a mine if no
+        # satisfactory placement leaves it free, and free if none puts a
+        # mine on it; each placement found shows that every point of the
+        # perimiter can be in the state it has in that placement.
+        esolver = self.esolver
+        mines = set([])
+        free = set([])
+        can_be_mine = set([])
+        can_be_free = set([])
+
+        # a limit set by the client still applies within the search
+        outer_limit = esolver.node_limit
+        esolver.node_limit = esolver.nodes + self.search_nodes
+        if outer_limit is not None:
+            esolver.node_limit = min(esolver.node_limit,outer_limit)
+        try:
+            for point in sorted(perimiter):
+                for (is_mine,witnessed) in ((True,can_be_mine),(False,can_be_free)):
+                    if point in witnessed or point in mines or point in free:
+                        continue
+
+                    # what is proven so far holds in every placement
+                    proposed_mines = mines | set([point]) if is_mine else set(mines)
+                    proposed_free = set(free) if is_mine else free | set([point])
+                    placement = next(esolver._sphelper(fringe_list,0,
+                        proposed_mines,proposed_free),None)
+
+                    if placement is None:
+                        (free if is_mine else mines).add(point)
+                    else:
+                        can_be_mine.update(placement)
+                        can_be_free.update(perimiter - placement)
+        except SearchLimitException:
+            pass
+        finally:
+            esolver.node_limit = outer_limit
+
+        return (mines,free)
+
 
 
 
@@ -0,0 +1,80 @@
+"""
+Transposition table for the components of the fringe solved by
+ExhaustiveSolver. A component is described by the positions of its
+constraints (revealed points, with the number of mines around them that have
+not been flagged) and of its unknown points. Two components that differ only
+by a translation, rotation or reflection of the board have the same canonical
+key, so the result of solving one can be reused for the other.
+
+functions
+    canonicalize() - return the canonical key of a component
+
+classes
+    TranspositionTable - size bounded, persistent mapping from keys to results
+"""
+
+from lrutable import LRUTable
+
+import os
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    'transpositions.pickle')
+
+# The 8 symmetries of a square board: rotations and reflections
+SYMMETRIES_2D = [
+    lambda x,y: (x,y),   lambda x,y: (-y,x),  lambda x,y: (-x,-y),
+    lambda x,y: (y,-x),  lambda x,y: (-x,y),  lambda x,y: (y,x),
+    lambda x,y: (x,-y),  lambda x,y: (-y,-x)]
+
+def canonicalize(constraints,unknowns):
+    """Return the canonical key of a component and how to map it back
+
+        Args:
+            constraints (dict) -- maps each revealed point of the component
+                to the number of unflagged mines around it
+            unknowns (iterable) -- the unrevealed, unflagged points of the
+                component
+
+        Returns:
+            (key,to_point)
+                key -- a hashable key, equal for equivalent components
+                to_point -- a dict mapping each unknown point in canonical
+                    coordinates to the corresponding point on the board
+    """
+    unknowns = list(unknowns)
+    points = list(constraints) + unknowns
+    codes = list(constraints.values()) + [-1]*len(unknowns)
+
+    if len(points[0]) == 2:
+        symmetries = SYMMETRIES_2D
+    else:
+        # only translations are considered for games that are not 2D
+        symmetries = [lambda *point: point]
+
+    best_key = None
+    for symmetry in symmetries:
+        moved = [symmetry(*point) for point in points]
+        low = [min(coords) for coords in zip(*moved)]
+        moved = [tuple(c - l for c,l in zip(point,low)) for point in moved]
+
+        key = tuple(sorted(point + (code,) for point,code in zip(moved,codes)))
+        if best_key is None or key < best_key:
+            best_key = key
+            best_moved = moved
+
+    # unknowns come last in points, and so in best_moved
+    num_constraints = len(constraints)
+    to_point = dict(zip(best_moved[num_constraints:],unknowns))
+
+    return (best_key,to_point)
+
+class TranspositionTable(LRUTable):
+    """
+    Size bounded mapping from canonical component keys to solve results.
+
+    See LRUTable. An entry of a hard game takes about 1.3 KB, so the
+    default bound of 20000 entries is about 26 MB per process.
+    """
+
+    DEFAULT_FILE = DEFAULT_FILE
+    MAX_ENTRIES = 20000
@@ -9,4 +9,22 @@ def powerset(iterable):
     s = list(iterable)
     return chain.from_iterable(combinations(s, r) for r in range(len(s)+1))
 
-    
\ No newline at end of file
+    
+def encode_varint(value, out):
+    "Append unsigned int value to bytearray out, 7 bits per byte (LEB128)"
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_varint(data, pos):
+    "Decode the varint starting at data[pos], return (value, next position)"
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7